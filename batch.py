@@ -0,0 +1,95 @@
+import argparse
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+import json
+import os
+import sys
+
+from bench import time_solve
+from mazefile import save_maze
+from mazegen import generate_maze, odd_size
+from solvers import SOLVERS
+
+DEFAULT_SOLVERS = ['bfs', 'astar_manhattan']
+
+
+def iter_jobs(count, sizes, first_seed=0):
+    for job_id in range(count):
+        yield job_id, sizes[job_id % len(sizes)], first_seed + job_id
+
+
+def solve_job(job, methods, include_path=False, save_dir=None):
+    job_id, size, seed = job
+    maze = generate_maze(size, seed)
+    start, goal = (1, 1), (size - 2, size - 2)
+    if save_dir:
+        save_maze(os.path.join(save_dir, f"maze_{size}_{seed}.maze"), maze, start, goal)
+    results = {}
+    for method in methods:
+        _, solve_func = SOLVERS[method]
+        elapsed, path, nodes_visited = time_solve(solve_func, maze, start, goal)
+        results[method] = {
+            'path_length': len(path),
+            'nodes_visited': nodes_visited,
+            'time_ms': round(elapsed * 1000, 4),
+        }
+        if include_path:
+            results[method]['path'] = path
+    return {'job': job_id, 'size': size, 'seed': seed, 'results': results}
+
+
+def solve_chunk(jobs, methods, include_path=False, save_dir=None):
+    # One task per chunk so the per-job IPC round trip is amortized
+    return [solve_job(job, methods, include_path, save_dir) for job in jobs]
+
+
+def run_batch(jobs, methods, workers=None, chunk_size=64, include_path=False, save_dir=None):
+    # Yields results as chunks finish, in completion order. Only a bounded number of
+    # chunks is in flight, so neither the job list nor the results pile up in memory.
+    workers = workers or os.cpu_count() or 1
+    jobs = iter(jobs)
+    max_pending = workers * 2
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        while True:
+            while len(pending) < max_pending:
+                chunk = list(islice(jobs, chunk_size))
+                if not chunk:
+                    break
+                pending.add(executor.submit(solve_chunk, chunk, methods, include_path, save_dir))
+            if not pending:
+                return
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate and solve seeded mazes in parallel.")
+    parser.add_argument('--count', type=int, default=1000, help="number of mazes to generate")
+    parser.add_argument('--sizes', type=odd_size, nargs='+', default=[41])
+    parser.add_argument('--first-seed', type=int, default=0)
+    parser.add_argument('--solvers', nargs='+', choices=sorted(SOLVERS), default=DEFAULT_SOLVERS)
+    parser.add_argument('--workers', type=int, default=None, help="defaults to the CPU count")
+    parser.add_argument('--chunk-size', type=int, default=64, help="jobs sent to a worker at once")
+    parser.add_argument('--include-path', action='store_true')
+    parser.add_argument('--save-dir', help="also save every generated maze to this directory")
+    parser.add_argument('--output', help="JSON-lines file to write instead of stdout")
+    args = parser.parse_args(argv)
+
+    if args.save_dir:
+        os.makedirs(args.save_dir, exist_ok=True)
+    jobs = iter_jobs(args.count, args.sizes, args.first_seed)
+    results = run_batch(jobs, args.solvers, args.workers, args.chunk_size, args.include_path,
+                        args.save_dir)
+    output = open(args.output, 'w') if args.output else sys.stdout
+    try:
+        for result in results:
+            output.write(json.dumps(result) + "\n")
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+import argparse
+import csv
+import json
+import math
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+from hpa import DEFAULT_CLUSTER_SIZE, ClusterGraph
+from mazefile import load_maze
+from mazegen import generate_maze, odd_size
+from solvers import SOLVERS
+
+DEFAULT_SIZES = [21, 101, 301]
+DEFAULT_SOLVERS = ['bfs', 'dfs', 'astar_manhattan', 'astar_euclidean', 'bidirectional_bfs', 'jps']
+FIELDS = ['size', 'solver', 'runs', 'median_ms', 'p95_ms', 'nodes_expanded',
+          'path_length', 'peak_memory_kb', 'abstract_nodes', 'maze_file']
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    rank = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[rank]
+
+
+def time_solve(solve_func, maze, start, goal):
+    begin = time.perf_counter()
+    path, nodes_visited = solve_func(maze, start, goal)
+    return time.perf_counter() - begin, path, nodes_visited
+
+
+def peak_memory(solve_func, maze, start, goal):
+    # Measured in a separate run so tracing overhead never skews the timings
+    tracemalloc.start()
+    try:
+        solve_func(maze, start, goal)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def benchmark_mazes(size, cases, solvers, repeat=3):
+    # cases is a list of (maze, start, goal) that share one row of the report; solvers
+    # are ids from SOLVERS or a dict of name -> solve function
+    if not isinstance(solvers, dict):
+        solvers = {method: SOLVERS[method][1] for method in solvers}
+    results = []
+    for method, solve_func in solvers.items():
+        timings, nodes, lengths, peaks = [], [], [], []
+        for maze, start, goal in cases:
+            for _ in range(repeat):
+                elapsed, path, nodes_visited = time_solve(solve_func, maze, start, goal)
+                timings.append(elapsed)
+            nodes.append(nodes_visited)
+            lengths.append(len(path))
+            peaks.append(peak_memory(solve_func, maze, start, goal))
+        results.append({
+            'size': size,
+            'solver': method,
+            'runs': len(timings),
+            'median_ms': round(statistics.median(timings) * 1000, 4),
+            'p95_ms': round(percentile(timings, 95) * 1000, 4),
+            'nodes_expanded': round(statistics.mean(nodes), 1),
+            'path_length': round(statistics.mean(lengths), 1),
+            'peak_memory_kb': round(max(peaks) / 1024, 1),
+        })
+    return results
+
+
+def run_benchmark(sizes, seeds, solvers, repeat=3):
+    results = []
+    for size in sizes:
+        start, goal = (1, 1), (size - 2, size - 2)
+        cases = [(generate_maze(size, seed), start, goal) for seed in seeds]
+        results.extend(benchmark_mazes(size, cases, solvers, repeat))
+    return results
+
+
+def run_file_benchmark(paths, solvers, repeat=3):
+    # Saved mazes stay memory-mapped, but every solve first unpacks the bits into its own
+    # padded byte-per-cell FlatGrid, so the timings include that copy
+    results = []
+    for path in paths:
+        with load_maze(path) as maze:
+            rows = benchmark_mazes(f"{maze.rows}x{maze.cols}", [(maze, maze.start, maze.goal)],
+                                   solvers, repeat)
+        for row in rows:
+            row['maze_file'] = path
+        results.extend(rows)
+    return results
+
+
+def random_queries(maze, count, rng):
+    rows, cols = len(maze), len(maze[0])
+    queries = []
+    while len(queries) < count * 2:
+        x, y = rng.randrange(rows), rng.randrange(cols)
+        if not maze[x][y]:
+            queries.append((x, y))
+    return list(zip(queries[::2], queries[1::2]))
+
+
+def run_query_benchmark(sizes, seeds, queries, repeat=3, cluster_size=DEFAULT_CLUSTER_SIZE):
+    # Many random start/goal pairs per maze: A* on the cells against HPA* on a cluster
+    # graph built once per maze. The build itself is reported as the hpa_build row.
+    results = []
+    rng = random.Random(0)
+    for size in sizes:
+        mazes = [generate_maze(size, seed) for seed in seeds]
+        graphs, build_times = {}, []
+        for maze in mazes:
+            begin = time.perf_counter()
+            graphs[id(maze)] = ClusterGraph(maze, cluster_size)
+            build_times.append(time.perf_counter() - begin)
+        results.append({
+            'size': size,
+            'solver': 'hpa_build',
+            'runs': len(build_times),
+            'median_ms': round(statistics.median(build_times) * 1000, 4),
+            'p95_ms': round(percentile(build_times, 95) * 1000, 4),
+            'nodes_expanded': None,
+            'path_length': None,
+            'peak_memory_kb': None,
+            # Size of the graph built, not a search count, so it gets a column of its own
+            'abstract_nodes': round(statistics.mean(len(graph.inter) for graph in graphs.values()), 1),
+        })
+
+        def hpa_solve(maze, start, goal):
+            return graphs[id(maze)].solve(start, goal)
+
+        cases = [(maze, start, goal) for maze in mazes for start, goal in random_queries(maze, queries, rng)]
+        results.extend(benchmark_mazes(size, cases, {'astar_manhattan': SOLVERS['astar_manhattan'][1],
+                                                     'hpa': hpa_solve}, repeat))
+    return results
+
+
+def write_results(results, output, fmt):
+    if fmt == 'csv':
+        writer = csv.DictWriter(output, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(results)
+    else:
+        json.dump(results, output, indent=2)
+        output.write("\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark maze solvers on seeded mazes.")
+    parser.add_argument('--sizes', type=odd_size, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--maze-files', nargs='+', help="benchmark saved mazes instead of generated ones")
+    parser.add_argument('--seeds', type=int, default=5, help="number of seeded mazes per size")
+    parser.add_argument('--first-seed', type=int, default=0)
+    parser.add_argument('--solvers', nargs='+', choices=sorted(SOLVERS), default=DEFAULT_SOLVERS)
+    parser.add_argument('--repeat', type=int, default=3, help="timed runs per maze and solver")
+    parser.add_argument('--queries', type=int, help="compare A* and HPA* on this many random "
+                                                    "start/goal pairs per maze")
+    parser.add_argument('--cluster-size', type=int, default=DEFAULT_CLUSTER_SIZE)
+    parser.add_argument('--format', choices=['json', 'csv'], default='json')
+    parser.add_argument('--output', help="write results to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    seeds = range(args.first_seed, args.first_seed + args.seeds)
+    if args.queries:
+        results = run_query_benchmark(args.sizes, seeds, args.queries, args.repeat, args.cluster_size)
+    elif args.maze_files:
+        results = run_file_benchmark(args.maze_files, args.solvers, args.repeat)
+    else:
+        results = run_benchmark(args.sizes, seeds, args.solvers, args.repeat)
+    if args.output:
+        with open(args.output, 'w', newline='') as output:
+            write_results(results, output, args.format)
+    else:
+        write_results(results, sys.stdout, args.format)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+from array import array
+from collections import OrderedDict
+import hashlib
+
+from mazefile import BitMaze
+from mazegen import Maze
+from solvers import SOLVERS
+from wavefront import DistanceField
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def maze_key(maze):
+    # Content hash, so regenerating an identical maze reuses its entries
+    digest = hashlib.blake2b(digest_size=16)
+    if isinstance(maze, Maze):
+        digest.update(f"{maze.rows}x{maze.cols}:".encode())
+        digest.update(maze.cells)
+    elif isinstance(maze, BitMaze):
+        # Packed bits get their own prefix: the same maze unpacked hashes differently
+        digest.update(f"{maze.rows}x{maze.cols}:bits:".encode())
+        digest.update(maze.bits)
+    else:
+        digest.update(f"{len(maze)}x{len(maze[0])}:".encode())
+        for row in maze:
+            digest.update(bytes(row))
+    costs = getattr(maze, 'costs', None)
+    if costs is not None:
+        # Terrain changes which paths are best, so weighted mazes never share entries
+        digest.update(b"costs:")
+        digest.update(costs)
+    return digest.hexdigest()
+
+
+def _solution_size(path, trace):
+    # Rough footprint: a list slot plus a two-int tuple per path cell
+    return 64 + len(path) * 72 + trace.itemsize * len(trace)
+
+
+class SolutionCache:
+    # LRU cache of solver results and BFS distance fields, bounded by an estimate
+    # of the memory held. Entries are grouped by maze so one maze can be dropped.
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.maze_entries = {}
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def _put(self, key, value, size):
+        if size > self.max_bytes:
+            return
+        self._discard(key)
+        self.entries[key] = (value, size)
+        self.maze_entries.setdefault(key[0], set()).add(key)
+        self.total_bytes += size
+        while self.total_bytes > self.max_bytes:
+            oldest = next(iter(self.entries))
+            self._discard(oldest)
+            self.evictions += 1
+
+    def _discard(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        self.total_bytes -= entry[1]
+        keys = self.maze_entries[key[0]]
+        keys.discard(key)
+        if not keys:
+            del self.maze_entries[key[0]]
+
+    def lookup(self, method, key, start, goal):
+        # Returns (path, nodes_visited, trace) or None; counts as a hit or a miss
+        # Distance fields are never used to answer BFS: their paths break ties differently
+        # and they carry neither the expansion count nor the trace the replay needs
+        return self._get((key, method, tuple(start), tuple(goal)))
+
+    def store(self, method, key, start, goal, path, nodes_visited, trace):
+        entry_key = (key, method, tuple(start), tuple(goal))
+        self._put(entry_key, (path, nodes_visited, trace), _solution_size(path, trace))
+
+    def solve(self, method, maze, start, goal, key=None, trace=None):
+        key = key or maze_key(maze)
+        cached = self.lookup(method, key, start, goal)
+        if cached is None:
+            _, solve_func = SOLVERS[method]
+            recorded = array('i')
+            path, nodes_visited = solve_func(maze, tuple(start), tuple(goal), recorded)
+            cached = (path, nodes_visited, recorded)
+            self.store(method, key, start, goal, path, nodes_visited, recorded)
+        path, nodes_visited, recorded = cached
+        if trace is not None:
+            trace.extend(recorded)
+        return list(path), nodes_visited
+
+    def distance_field(self, maze, source, key=None):
+        key = key or maze_key(maze)
+        entry_key = (key, 'distance_field', tuple(source))
+        field = self._get(entry_key)
+        if field is None:
+            field = DistanceField(maze, source)
+            self._put(entry_key, field, field.nbytes)
+        return field
+
+    def invalidate_maze(self, key):
+        for entry_key in list(self.maze_entries.get(key, ())):
+            self._discard(entry_key)
+
+    def clear(self):
+        self.entries.clear()
+        self.maze_entries.clear()
+        self.total_bytes = 0
+
+    def stats(self):
+        return {
+            'entries': len(self.entries),
+            'bytes': self.total_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
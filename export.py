@@ -0,0 +1,226 @@
+import argparse
+from array import array
+import os
+import queue
+import struct
+import sys
+import threading
+import time
+import zlib
+
+# Render without a window; must be set before pygame is initialised by mazeFinder
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import numpy as np
+import pygame
+
+from mazeFinder import (SOLUTION_COLOR, TRANSITION_SPEED, VISITED_COLOR, AgentMotion,
+                        MazeRenderer)
+from mazefile import MazeFileError, read_maze
+from mazegen import generate_maze, odd_size
+from solvers import SOLVERS, solve
+
+DEFAULT_SIZE = 41
+DEFAULT_STEPS_PER_FRAME = 4
+DEFAULT_MAX_QUEUED = 64
+PNG_LEVEL = 1
+_PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+# Frames are drawn into a surface whose bytes are R, G, B, unused on any byte order
+_RGBX_MASKS = ((0xff, 0xff00, 0xff0000, 0) if sys.byteorder == 'little'
+               else (0xff000000, 0xff0000, 0xff00, 0))
+
+
+def _png_chunk(kind, data):
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+
+def _copy_rgb(frame, out):
+    # Channel by channel: numpy copies the strided (h, w, 3) slice of RGBX in one go
+    # several times slower
+    for channel in range(3):
+        out[:, :, channel] = frame[:, :, channel]
+    return out
+
+
+def rgb_bytes(frame):
+    return _copy_rgb(frame, np.empty(frame.shape[:2] + (3,), dtype=np.uint8)).tobytes()
+
+
+def encode_png(frame, level=PNG_LEVEL):
+    # Truecolor PNG with no row filters. zlib and numpy's copies release the GIL, which
+    # is what lets several writer threads encode at once.
+    height, width = frame.shape[:2]
+    rows = np.zeros((height, width * 3 + 1), dtype=np.uint8)
+    _copy_rgb(frame, rows[:, 1:].reshape(height, width, 3))
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return b''.join((_PNG_SIGNATURE, _png_chunk(b'IHDR', header),
+                     _png_chunk(b'IDAT', zlib.compress(rows.tobytes(), level)),
+                     _png_chunk(b'IEND', b'')))
+
+
+class FrameWriter:
+    # Frames are handed over through a bounded queue to writer threads, so rendering
+    # runs ahead of encoding by at most max_queued frames and then waits for them.
+    # write_frame(index, frame) runs on the writer threads; the first error it raises
+    # stops the export and is raised again from submit() or close().
+    def __init__(self, write_frame, workers=1, max_queued=DEFAULT_MAX_QUEUED):
+        self.write_frame = write_frame
+        self.frames = queue.Queue(max_queued)
+        self.error = None
+        self.written = 0
+        self.lock = threading.Lock()
+        self.threads = [threading.Thread(target=self.work, daemon=True) for _ in range(workers)]
+        for thread in self.threads:
+            thread.start()
+
+    def work(self):
+        while True:
+            item = self.frames.get()
+            if item is None:
+                return
+            if self.error is not None:
+                continue
+            try:
+                self.write_frame(*item)
+            except Exception as error:
+                self.error = self.error or error
+            else:
+                with self.lock:
+                    self.written += 1
+
+    def submit(self, index, frame):
+        if self.error is not None:
+            self.close()
+        self.frames.put((index, frame))
+
+    def close(self):
+        for _ in self.threads:
+            self.frames.put(None)
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+        if self.error is not None:
+            raise self.error
+
+
+def png_sequence_writer(directory, workers=None, max_queued=DEFAULT_MAX_QUEUED):
+    # One file per frame, so any number of threads can encode out of order
+    os.makedirs(directory, exist_ok=True)
+
+    def write_frame(index, frame):
+        with open(os.path.join(directory, f"frame_{index:06d}.png"), 'wb') as output:
+            output.write(encode_png(frame))
+    return FrameWriter(write_frame, workers or os.cpu_count() or 1, max_queued)
+
+
+def raw_rgb_writer(output, max_queued=DEFAULT_MAX_QUEUED):
+    # Frames back to back as rgb24, e.g. for ffmpeg -f rawvideo. A single thread keeps
+    # them in order; it still overlaps the writes with rendering.
+    def write_frame(index, frame):
+        output.write(rgb_bytes(frame))
+    return FrameWriter(write_frame, 1, max_queued)
+
+
+def render_solve_frames(maze, start, goal, method, steps_per_frame=DEFAULT_STEPS_PER_FRAME,
+                        frames_per_cell=TRANSITION_SPEED):
+    # Replays a solve as the window would show it: the expansions, the solution, then the
+    # agent walking it. Nothing waits on a clock, so frames come out as fast as they can
+    # be drawn. Each frame is a (height, width, 4) RGBX array of the maze view holding a
+    # copy of the pixels; converting it is left to the writer threads.
+    trace = array('i')
+    path, _ = solve(method, maze, start, goal, trace)
+    renderer = MazeRenderer()
+    renderer.set_maze(maze, start, goal)
+    # Blits onto the screen are clipped to it, so it only needs to cover the view
+    width, height = renderer.view_rect.size
+    screen = pygame.Surface((width, height), 0, 32, _RGBX_MASKS)
+    cols = renderer.cols
+    agent_pos = list(start)
+
+    def frame():
+        renderer.draw(screen, agent_pos)
+        pixels = np.frombuffer(screen.get_buffer().raw, dtype=np.uint8)
+        return pixels.reshape(height, screen.get_pitch() // 4, 4)[:, :width]
+
+    yield frame()
+    for first in range(0, len(trace), steps_per_frame):
+        for index in trace[first:first + steps_per_frame]:
+            renderer.paint_cell(divmod(index, cols), VISITED_COLOR)
+        yield frame()
+
+    renderer.clear_overlay()
+    for cell in path:
+        renderer.paint_cell(cell, SOLUTION_COLOR)
+    yield frame()
+    if path:
+        motion = AgentMotion(start, list(path), frames_per_cell)
+        while not motion.done:
+            renderer.ensure_visible(motion.target)
+            agent_pos, _ = motion.advance()
+            yield frame()
+        renderer.clear_overlay()
+        yield frame()
+
+
+def export_solve(maze, start, goal, method, writer, steps_per_frame=DEFAULT_STEPS_PER_FRAME,
+                 frames_per_cell=TRANSITION_SPEED):
+    count = 0
+    try:
+        for count, rgb in enumerate(render_solve_frames(maze, start, goal, method,
+                                                        steps_per_frame, frames_per_cell), 1):
+            writer.submit(count - 1, rgb)
+    finally:
+        writer.close()
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render a solve animation offscreen to frames.")
+    parser.add_argument('output', help="directory for PNG frames, or a file ('-' for stdout) "
+                                       "for raw rgb24 with --raw")
+    parser.add_argument('--solver', choices=sorted(SOLVERS), default='bfs')
+    parser.add_argument('--maze-file', help="solve a saved maze instead of a generated one")
+    parser.add_argument('--size', type=odd_size, default=DEFAULT_SIZE)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--steps-per-frame', type=int, default=DEFAULT_STEPS_PER_FRAME,
+                        help="expanded cells drawn per frame")
+    parser.add_argument('--frames-per-cell', type=int, default=TRANSITION_SPEED,
+                        help="frames the agent takes to move one cell")
+    parser.add_argument('--raw', action='store_true', help="write raw rgb24 instead of PNGs")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="PNG encoder threads; defaults to the CPU count")
+    parser.add_argument('--max-queued', type=int, default=DEFAULT_MAX_QUEUED,
+                        help="frames rendered ahead of the writers")
+    args = parser.parse_args(argv)
+
+    if args.maze_file:
+        try:
+            maze, start, goal = read_maze(args.maze_file)
+        except (OSError, MazeFileError) as error:
+            parser.error(f"could not load {args.maze_file}: {error}")
+    else:
+        maze = generate_maze(args.size, args.seed)
+        start, goal = (1, 1), (args.size - 2, args.size - 2)
+
+    size = MazeRenderer().view_rect.size
+    begin = time.perf_counter()
+    if args.raw:
+        output = sys.stdout.buffer if args.output == '-' else open(args.output, 'wb')
+        try:
+            count = export_solve(maze, start, goal, args.solver,
+                                 raw_rgb_writer(output, args.max_queued),
+                                 args.steps_per_frame, args.frames_per_cell)
+        finally:
+            if output is not sys.stdout.buffer:
+                output.close()
+    else:
+        writer = png_sequence_writer(args.output, args.workers, args.max_queued)
+        count = export_solve(maze, start, goal, args.solver, writer,
+                             args.steps_per_frame, args.frames_per_cell)
+    elapsed = time.perf_counter() - begin
+    print(f"Wrote {count} {size[0]}x{size[1]} frames in {elapsed:.2f}s "
+          f"({count / elapsed:.0f} fps)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
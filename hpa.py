@@ -0,0 +1,333 @@
+from array import array
+from collections import deque
+import heapq
+import math
+import zipfile
+
+import numpy as np
+
+from cache import maze_key
+from mazefile import MazeFileError
+from solvers import DIRECTIONS, heuristic_manhattan, run_steps
+
+DEFAULT_CLUSTER_SIZE = 32
+# Border runs shorter than this get one transition in the middle, longer ones one per end
+MAX_SINGLE_TRANSITION = 6
+GRAPH_VERSION = 1
+
+
+def graph_file(maze_path):
+    # The cluster graph is stored next to the maze it was built for
+    return maze_path + ".hpa"
+
+
+def _walk(parents, cell):
+    # Cells from just after the search tree's root to cell
+    cells = array('i')
+    while parents[cell] is not None:
+        cells.append(cell)
+        cell = parents[cell]
+    cells.reverse()
+    return cells
+
+
+class ClusterGraph:
+    # HPA* abstraction of a maze. The grid is split into square clusters; where an open
+    # corridor crosses a cluster border a pair of transition cells becomes abstract
+    # nodes, and the distances between the nodes of each cluster are precomputed.
+    # Queries search this small graph first and only then walk the cells, one cluster
+    # at a time. Paths are shortest whenever border runs are short, as in generated
+    # mazes; wide open borders can make them slightly longer than optimal.
+    def __init__(self, maze, cluster_size=DEFAULT_CLUSTER_SIZE, build=True):
+        self.maze = maze
+        self.rows, self.cols = len(maze), len(maze[0])
+        self.cluster_size = cluster_size
+        self.cluster_rows = -(-self.rows // cluster_size)
+        self.cluster_cols = -(-self.cols // cluster_size)
+        self.borders = {}
+        self.inter = {}
+        self.intra = {}
+        # Cells between two nodes of a cluster, keyed (lower node, higher node)
+        self.segments = {}
+        if build:
+            run_steps(self.build_steps())
+
+    def cluster_of(self, index):
+        x, y = divmod(index, self.cols)
+        return x // self.cluster_size, y // self.cluster_size
+
+    def cluster_bounds(self, cluster):
+        cs = self.cluster_size
+        x0, y0 = cluster[0] * cs, cluster[1] * cs
+        return x0, min(x0 + cs, self.rows), y0, min(y0 + cs, self.cols)
+
+    def cluster_borders(self, cluster):
+        # Keys are (cluster, cluster below or to the right)
+        cx, cy = cluster
+        keys = []
+        if cx > 0:
+            keys.append(((cx - 1, cy), cluster))
+        if cy > 0:
+            keys.append(((cx, cy - 1), cluster))
+        if cx + 1 < self.cluster_rows:
+            keys.append((cluster, (cx + 1, cy)))
+        if cy + 1 < self.cluster_cols:
+            keys.append((cluster, (cx, cy + 1)))
+        return keys
+
+    def cluster_nodes(self, cluster):
+        nodes = set()
+        for key in self.cluster_borders(cluster):
+            side = 0 if key[0] == cluster else 1
+            nodes.update(pair[side] for pair in self.borders.get(key, ()))
+        return nodes
+
+    def build_steps(self):
+        # Yields each transition cell as it is placed, then the nodes of each finished
+        # cluster, so a caller can spread the build over frames
+        for cx in range(self.cluster_rows):
+            for cy in range(self.cluster_cols):
+                for key in self.cluster_borders((cx, cy))[-2:]:
+                    if key[0] == (cx, cy):
+                        yield from self._border_steps(key)
+        for cx in range(self.cluster_rows):
+            for cy in range(self.cluster_cols):
+                self._build_cluster((cx, cy))
+                yield from self.intra[cx, cy]
+
+    def _border_pairs(self, key):
+        (cx, cy), (nx, ny) = key
+        x0, x1, y0, y1 = self.cluster_bounds((cx, cy))
+        cols = self.cols
+        if nx > cx:
+            return [((x1 - 1) * cols + y, x1 * cols + y) for y in range(y0, y1)]
+        return [(x * cols + y1 - 1, x * cols + y1) for x in range(x0, x1)]
+
+    def _border_steps(self, key):
+        inter = self.inter
+        for a, b in self.borders.pop(key, ()):
+            for node, other in ((a, b), (b, a)):
+                inter[node].discard(other)
+                if not inter[node]:
+                    del inter[node]
+        cells, cols = self.maze, self.cols
+        transitions = []
+        run = []
+        for a, b in self._border_pairs(key) + [(None, None)]:
+            if a is not None and not cells[a // cols][a % cols] and not cells[b // cols][b % cols]:
+                run.append((a, b))
+                continue
+            if len(run) >= MAX_SINGLE_TRANSITION:
+                transitions.extend((run[0], run[-1]))
+            elif run:
+                transitions.append(run[len(run) // 2])
+            run = []
+        for a, b in transitions:
+            inter.setdefault(a, set()).add(b)
+            inter.setdefault(b, set()).add(a)
+            yield a
+            yield b
+        self.borders[key] = transitions
+
+    def _cluster_bfs(self, source, cluster, targets):
+        # Breadth-first search confined to one cluster; stops once every target is reached.
+        # Returns (parents, depth, nodes_visited).
+        maze, cols = self.maze, self.cols
+        x0, x1, y0, y1 = self.cluster_bounds(cluster)
+        parents = {source: None}
+        depth = {source: 0}
+        remaining = set(targets)
+        remaining.discard(source)
+        queue = deque([source])
+        nodes_visited = 0
+        while queue and remaining:
+            index = queue.popleft()
+            nodes_visited += 1
+            yield index
+            x, y = divmod(index, cols)
+            for dx, dy in DIRECTIONS:
+                nx, ny = x + dx, y + dy
+                if x0 <= nx < x1 and y0 <= ny < y1 and not maze[nx][ny]:
+                    neighbor = nx * cols + ny
+                    if neighbor not in parents:
+                        parents[neighbor] = index
+                        depth[neighbor] = depth[index] + 1
+                        remaining.discard(neighbor)
+                        queue.append(neighbor)
+        return parents, depth, nodes_visited
+
+    def _build_cluster(self, cluster):
+        segments = self.segments
+        for node, others in self.intra.get(cluster, {}).items():
+            for other in others:
+                segments.pop((node, other), None)
+        nodes = self.cluster_nodes(cluster)
+        edges = {}
+        for node in nodes:
+            parents, depth, _ = run_steps(self._cluster_bfs(node, cluster, nodes))
+            edges[node] = {other: depth[other] for other in nodes if other != node and other in depth}
+            for other in edges[node]:
+                if other > node:
+                    segments[node, other] = _walk(parents, other)
+        self.intra[cluster] = edges
+
+    def update_cells(self, cells):
+        # Rebuild only the borders the changed cells lie on and the clusters they touch
+        cs = self.cluster_size
+        borders, clusters = set(), set()
+        for x, y in cells:
+            cluster = (x // cs, y // cs)
+            clusters.add(cluster)
+            x0, x1, y0, y1 = self.cluster_bounds(cluster)
+            for key in self.cluster_borders(cluster):
+                other = key[1] if key[0] == cluster else key[0]
+                if ((other[0] < cluster[0] and x == x0) or (other[0] > cluster[0] and x == x1 - 1)
+                        or (other[1] < cluster[1] and y == y0) or (other[1] > cluster[1] and y == y1 - 1)):
+                    borders.add(key)
+        for key in borders:
+            run_steps(self._border_steps(key))
+            clusters.update(key)
+        for cluster in clusters:
+            self._build_cluster(cluster)
+
+    def update_cell(self, x, y):
+        self.update_cells([(x, y)])
+
+    def update_cluster(self, cluster):
+        # Any number of cells inside cluster changed
+        clusters = {cluster}
+        for key in self.cluster_borders(cluster):
+            run_steps(self._border_steps(key))
+            clusters.update(key)
+        for touched in clusters:
+            self._build_cluster(touched)
+
+    def solve(self, start, goal, trace=None):
+        return run_steps(self.solve_steps(start, goal), trace)
+
+    def solve_steps(self, start, goal):
+        cols = self.cols
+        start, goal = tuple(start), tuple(goal)
+        source, target = start[0] * cols + start[1], goal[0] * cols + goal[1]
+        start_cluster, goal_cluster = self.cluster_of(source), self.cluster_of(target)
+
+        # Temporary edges join the start and goal to the nodes of their clusters
+        start_targets = self.cluster_nodes(start_cluster)
+        if start_cluster == goal_cluster:
+            start_targets.add(target)
+        start_parents, depth, nodes_visited = yield from self._cluster_bfs(source, start_cluster,
+                                                                           start_targets)
+        start_edges = [(node, depth[node]) for node in start_targets if node in depth]
+        goal_targets = self.cluster_nodes(goal_cluster)
+        goal_parents, depth, expanded = yield from self._cluster_bfs(target, goal_cluster, goal_targets)
+        nodes_visited += expanded
+        goal_edges = {node: depth[node] for node in goal_targets if node in depth}
+
+        goal_x, goal_y = goal
+        intra, inter = self.intra, self.inter
+        cs = self.cluster_size
+        heappush, heappop = heapq.heappush, heapq.heappop
+        open_set = [(heuristic_manhattan(start, goal), 0, source)]
+        g_score = {source: 0}
+        came_from = {source: None}
+        while open_set:
+            _, cost, node = heappop(open_set)
+            if cost > g_score[node]:
+                continue
+            nodes_visited += 1
+            yield node
+            if node == target:
+                break
+            x, y = divmod(node, cols)
+            edges = list(intra.get((x // cs, y // cs), {}).get(node, {}).items())
+            edges.extend((other, 1) for other in inter.get(node, ()))
+            if node == source:
+                edges.extend(start_edges)
+            if node in goal_edges:
+                edges.append((target, goal_edges[node]))
+            for neighbor, weight in edges:
+                tentative = cost + weight
+                if tentative < g_score.get(neighbor, math.inf):
+                    g_score[neighbor] = tentative
+                    came_from[neighbor] = node
+                    nx, ny = divmod(neighbor, cols)
+                    heappush(open_set, (tentative + abs(nx - goal_x) + abs(ny - goal_y), tentative, neighbor))
+        else:
+            return [], nodes_visited
+
+        abstract = []
+        node = target
+        while node is not None:
+            abstract.append(node)
+            node = came_from[node]
+        abstract.reverse()
+
+        # Expand each abstract edge into cells from the stored segments and search trees
+        cells = [source]
+        for a, b in zip(abstract, abstract[1:]):
+            if b in inter.get(a, ()):
+                cells.append(b)
+            elif a == source and b in start_parents:
+                cells.extend(_walk(start_parents, b))
+            elif b == target and a in goal_parents:
+                cells.extend(_walk(goal_parents, a)[-2::-1])
+                cells.append(target)
+            elif a < b:
+                cells.extend(self.segments[a, b])
+            else:
+                cells.extend(self.segments[b, a][-2::-1])
+                cells.append(b)
+        return [divmod(index, cols) for index in cells], nodes_visited
+
+    def save(self, path):
+        transitions = [(*key[0], *key[1], a, b) for key, pairs in self.borders.items() for a, b in pairs]
+        edges = [(node, other, distance)
+                 for cluster in self.intra.values()
+                 for node, others in cluster.items()
+                 for other, distance in others.items() if node < other]
+        # Segments are stored back to back in edge order; each is as long as its distance
+        segments = array('i')
+        for node, other, _ in edges:
+            segments.extend(self.segments[node, other])
+        with open(path, 'wb') as output:
+            np.savez(output,
+                     meta=np.array([GRAPH_VERSION, self.cluster_size, self.rows, self.cols], dtype=np.int64),
+                     key=np.frombuffer(bytes.fromhex(maze_key(self.maze)), dtype=np.uint8),
+                     transitions=np.array(transitions, dtype=np.int64).reshape(-1, 6),
+                     edges=np.array(edges, dtype=np.int64).reshape(-1, 3),
+                     segments=np.frombuffer(segments, dtype=np.int32))
+
+    @classmethod
+    def load(cls, path, maze):
+        try:
+            with np.load(path) as data:
+                meta, key = data['meta'], data['key'].tobytes().hex()
+                transitions, edges = data['transitions'], data['edges']
+                segments = array('i', data['segments'].astype(np.int32).tobytes())
+        except (KeyError, ValueError, zipfile.BadZipFile) as error:
+            raise MazeFileError(f"{path}: not a cluster graph ({error})") from error
+        version, cluster_size, rows, cols = (int(value) for value in meta)
+        if version != GRAPH_VERSION:
+            raise MazeFileError(f"{path}: unsupported cluster graph version {version}")
+        if key != maze_key(maze):
+            raise MazeFileError(f"{path}: cluster graph was built for a different maze")
+
+        graph = cls(maze, cluster_size, build=False)
+        inter = graph.inter
+        for cx, cy, nx, ny, a, b in transitions.tolist():
+            graph.borders.setdefault(((cx, cy), (nx, ny)), []).append((a, b))
+            inter.setdefault(a, set()).add(b)
+            inter.setdefault(b, set()).add(a)
+        for cx in range(graph.cluster_rows):
+            for cy in range(graph.cluster_cols):
+                for key in graph.cluster_borders((cx, cy)):
+                    graph.borders.setdefault(key, [])
+                graph.intra[cx, cy] = {node: {} for node in graph.cluster_nodes((cx, cy))}
+        offset = 0
+        for node, other, distance in edges.tolist():
+            cluster = graph.intra[graph.cluster_of(node)]
+            cluster[node][other] = distance
+            cluster[other][node] = distance
+            graph.segments[node, other] = segments[offset:offset + distance]
+            offset += distance
+        return graph
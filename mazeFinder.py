@@ -1,10 +1,19 @@
 import pygame
-import random
 import sys
 import time
 import math
-from collections import deque
-import heapq
+from array import array
+from collections import OrderedDict
+
+import numpy as np
+
+from cache import SolutionCache, maze_key
+from hpa import ClusterGraph, graph_file
+from mazefile import MazeFileError, read_maze, save_maze
+from mazegen import MAX_TERRAIN_COST, PASSAGE, WALL, add_terrain, generate_maze
+from profiling import profiler
+from solvers import SOLVERS, LPAStar, path_cost, solve_steps
+from wavefront import cell_grid, cost_grid
 
 # Initialize Pygame
 pygame.init()
@@ -15,6 +24,16 @@ MAZE_WIDTH = 700
 GRID_SIZE = 21
 CELL_SIZE = MAZE_WIDTH // GRID_SIZE
 SIDEBAR_WIDTH = WINDOW_WIDTH - MAZE_WIDTH
+MAZE_FILE = "saved.maze"
+PROFILE_TRACE_FILE = "profile_trace.json"
+
+# Viewport settings
+TILE_SIZE = 256
+MAX_TILES = 128
+MAX_CELL_SIZE = 64
+DETAIL_CELL_SIZE = 6
+PAN_STEP = 40
+MAX_RESTORED_CELLS = 2048
 
 # Enhanced Color Scheme
 BACKGROUND = (18, 18, 18)
@@ -25,6 +44,7 @@ SOLUTION_COLOR = (255, 204, 77)
 START_COLOR = (72, 187, 120)
 GOAL_COLOR = (235, 83, 83)
 AGENT_COLOR = (52, 152, 219)
+HEAT_COLOR = (230, 126, 34)
 
 # Button colors
 BUTTON_COLOR = (52, 73, 94)
@@ -37,6 +57,113 @@ NEW_MAZE_HOVER_COLOR = (231, 76, 60)
 TRANSITION_SPEED = 8
 BUTTON_CLICK_DURATION = 100
 FADE_DURATION = 500
+PARTICLE_CAPACITY = 65536
+# Pixel offsets covered by a particle of each radius
+PARTICLE_DISKS = {
+    radius: np.array([(dx, dy) for dx in range(-radius, radius + 1) for dy in range(-radius, radius + 1)
+                      if dx * dx + dy * dy <= radius * radius])
+    for radius in range(1, 4)
+}
+MANUAL_TRANSITION_SPEED = 3
+RESET_DELAY = 500
+
+# Search stepping: expansions per frame are capped by the selected speed and by a
+# wall-clock budget, so input is still handled every frame. None means unlimited.
+SEARCH_TIME_BUDGET = 0.004
+SEARCH_SPEEDS = [2 ** i for i in range(13)] + [None]
+
+# Everything the sidebar can search with: the registered solvers plus HPA*, which
+# needs a cluster graph kept per maze
+SEARCH_LABELS = {solver_id: label for solver_id, (label, _) in SOLVERS.items()}
+SEARCH_LABELS['hpa'] = "HPA*"
+
+def terrain_color(cost):
+    # Cost 1 is plain path; the most expensive terrain is fully HEAT_COLOR
+    t = min(1.0, (cost - 1) / (MAX_TERRAIN_COST - 1))
+    return tuple(int(p + (h - p) * t) for p, h in zip(PATH_COLOR, HEAT_COLOR))
+
+class AssetCache:
+    def __init__(self, max_text_surfaces=256):
+        self.max_text_surfaces = max_text_surfaces
+        self.window_size = None
+        self.cell_size = None
+        self.surfaces = {}
+        self.fonts = {}
+        self.texts = {}
+
+    def configure(self, window_size, cell_size):
+        # Cached sprites are sized for the window and cells, so a change invalidates them all
+        if (window_size, cell_size) != (self.window_size, self.cell_size):
+            self.clear()
+            self.window_size = window_size
+            self.cell_size = cell_size
+
+    def clear(self):
+        self.surfaces.clear()
+        self.texts.clear()
+
+    def cached(self, key, build):
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = self.surfaces[key] = build()
+        return surface
+
+    def cell_gradient(self, size):
+        def build():
+            gradient = pygame.Surface((size, size), pygame.SRCALPHA)
+            pygame.draw.rect(gradient, (255, 255, 255, 20), gradient.get_rect())
+            return gradient
+        return self.cached(('cell_gradient', size), build)
+
+    def agent_glow(self, cell_size, color=AGENT_COLOR):
+        def build():
+            glow_surface = pygame.Surface((cell_size * 3, cell_size * 3), pygame.SRCALPHA)
+            for radius in range(cell_size * 2, 0, -2):
+                alpha = int(100 * (radius / (cell_size * 2)))
+                pygame.draw.circle(glow_surface, (*color[:3], alpha),
+                                 (cell_size * 1.5, cell_size * 1.5), radius)
+            return glow_surface
+        return self.cached(('agent_glow', cell_size, color), build)
+
+    def sidebar_background(self, width, height):
+        def build():
+            sidebar_surface = pygame.Surface((width, height))
+            for y in range(height):
+                alpha = int(255 * (1 - y / height))
+                pygame.draw.line(sidebar_surface, (*BACKGROUND, alpha), 
+                               (0, y), (width, y))
+            return sidebar_surface
+        return self.cached(('sidebar', width, height), build)
+
+    def rounded_overlay(self, width, height, color, border_radius=10):
+        def build():
+            overlay = pygame.Surface((width, height), pygame.SRCALPHA)
+            pygame.draw.rect(overlay, color, overlay.get_rect(), border_radius=border_radius)
+            return overlay
+        return self.cached(('rounded_overlay', width, height, color, border_radius), build)
+
+    def font(self, size):
+        # Fonts do not depend on the window or cell size, so they survive clear()
+        font = self.fonts.get(size)
+        if font is None:
+            font = self.fonts[size] = pygame.font.Font(None, size)
+        return font
+
+    def text(self, text, size, color, alpha=None):
+        key = (text, size, color, alpha)
+        surface = self.texts.get(key)
+        if surface is None:
+            if len(self.texts) >= self.max_text_surfaces:
+                # Stats lines change every solve; drop the oldest rendering first
+                del self.texts[next(iter(self.texts))]
+            surface = self.font(size).render(text, True, color)
+            if alpha is not None:
+                surface.set_alpha(alpha)
+            self.texts[key] = surface
+        return surface
+
+
+assets = AssetCache()
 
 class ModernButton:
     def __init__(self, x, y, width, height, text, color=BUTTON_COLOR, hover_color=BUTTON_HOVER_COLOR):
@@ -62,23 +189,18 @@ class ModernButton:
         button_rect.y -= self.click_animation
         pygame.draw.rect(surface, self.color, button_rect, border_radius=10)
         
-        gradient = pygame.Surface((button_rect.width, button_rect.height), pygame.SRCALPHA)
-        pygame.draw.rect(gradient, (255, 255, 255, 30), gradient.get_rect(), border_radius=10)
+        gradient = assets.rounded_overlay(button_rect.width, button_rect.height, (255, 255, 255, 30))
         gradient_rect = gradient.get_rect(topleft=button_rect.topleft)
         surface.blit(gradient, gradient_rect)
         
-        font = pygame.font.Font(None, 36)
-        shadow_surface = font.render(self.text, True, (0, 0, 0))
-        text_surface = font.render(self.text, True, BUTTON_TEXT_COLOR)
+        shadow_surface = assets.text(self.text, 36, (0, 0, 0), self.alpha // 2)
+        text_surface = assets.text(self.text, 36, BUTTON_TEXT_COLOR, self.alpha)
         
         text_rect = text_surface.get_rect(center=button_rect.center)
         shadow_rect = text_rect.copy()
         shadow_rect.x += 2
         shadow_rect.y += 2
         
-        shadow_surface.set_alpha(self.alpha // 2)
-        text_surface.set_alpha(self.alpha)
-        
         surface.blit(shadow_surface, shadow_rect)
         surface.blit(text_surface, text_rect)
         
@@ -94,89 +216,570 @@ class ModernButton:
         return False
 
 class ParticleSystem:
-    def __init__(self):
-        self.particles = []
-        
+    # Struct-of-arrays pool: particles live in preallocated NumPy columns, dead ones
+    # are compacted away by moving survivors from the tail into the holes.
+    def __init__(self, capacity=PARTICLE_CAPACITY):
+        self.capacity = capacity
+        self.count = 0
+        self.pos = np.zeros((capacity, 2), dtype=np.float32)
+        self.vel = np.zeros((capacity, 2), dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.float32)
+        self.color = np.zeros(capacity, dtype=np.uint8)
+        self.palette = []
+
+    def color_index(self, color):
+        color = tuple(color[:3])
+        if color not in self.palette:
+            self.palette.append(color)
+        return self.palette.index(color)
+
+    def emit(self, pos, color, amount):
+        amount = min(amount, self.capacity - self.count)
+        if amount <= 0:
+            return
+        start, end = self.count, self.count + amount
+        angle = np.random.uniform(0, 2 * math.pi, amount)
+        speed = np.random.uniform(2, 5, amount)
+        self.pos[start:end] = pos
+        self.vel[start:end, 0] = np.cos(angle) * speed
+        self.vel[start:end, 1] = np.sin(angle) * speed
+        self.life[start:end] = 1.0
+        self.color[start:end] = self.color_index(color)
+        self.count = end
+
     def create_particle(self, pos, color):
-        angle = random.uniform(0, 2 * math.pi)
-        speed = random.uniform(2, 5)
-        self.particles.append({
-            'pos': list(pos),
-            'vel': [math.cos(angle) * speed, math.sin(angle) * speed],
-            'life': 1.0,
-            'color': color
-        })
+        self.emit(pos, color, 1)
         
     def update(self):
-        for p in self.particles[:]:
-            p['pos'][0] += p['vel'][0]
-            p['pos'][1] += p['vel'][1]
-            p['life'] -= 0.02
-            if p['life'] <= 0:
-                self.particles.remove(p)
+        n = self.count
+        self.pos[:n] += self.vel[:n]
+        self.life[:n] -= 0.02
+        alive = self.life[:n] > 0
+        survivors = int(np.count_nonzero(alive))
+        if survivors == n:
+            return
+        holes = np.flatnonzero(~alive[:survivors])
+        movers = np.flatnonzero(alive[survivors:]) + survivors
+        for column in (self.pos, self.vel, self.life, self.color):
+            column[holes] = column[movers]
+        self.count = survivors
                 
     def draw(self, surface):
-        for p in self.particles:
-            color = list(p['color'])
-            color.append(int(255 * p['life']))
-            pygame.draw.circle(surface, color, 
-                             (int(p['pos'][0]), int(p['pos'][1])), 
-                             int(3 * p['life']))
+        # Particles are stamped straight into the pixel array, one vectorized write per
+        # radius, instead of one draw call per particle. The radius shrinks with life.
+        n = self.count
+        if not n:
+            return []
+        radii = (3 * self.life[:n]).astype(np.int32)
+        centers = self.pos[:n].astype(np.int32)
+        palette = np.array([surface.map_rgb(color) for color in self.palette], dtype=np.uint32)
+        width, height = surface.get_size()
+        pixels = pygame.surfarray.pixels2d(surface)
+        try:
+            for radius, offsets in PARTICLE_DISKS.items():
+                index = np.flatnonzero(radii == radius)
+                if not index.size:
+                    continue
+                xs = (centers[index, 0, None] + offsets[:, 0]).ravel()
+                ys = (centers[index, 1, None] + offsets[:, 1]).ravel()
+                colors = np.repeat(palette[self.color[index]], len(offsets))
+                inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+                pixels[xs[inside], ys[inside]] = colors[inside]
+        finally:
+            del pixels
+        left, top = centers.min(axis=0) - 3
+        right, bottom = centers.max(axis=0) + 4
+        return [pygame.Rect(left, top, right - left, bottom - top).clip(surface.get_rect())]
+
+class MazeRenderer:
+    # Draws the maze through a pan/zoom camera. The static maze is rendered lazily into
+    # tiles kept in an LRU cache, and only tiles inside the view are ever drawn. When a
+    # cell would be smaller than a pixel, a downsampled overview of the maze is used.
+    def __init__(self, cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells_per_pixel = 1
+        self.rows = self.cols = GRID_SIZE
+        self.offset = [0, 0]
+        self.panel_rect = pygame.Rect(0, 0, MAZE_WIDTH, WINDOW_HEIGHT)
+        self.view_rect = pygame.Rect(0, 0, MAZE_WIDTH, MAZE_WIDTH)
+        self.frame = pygame.Surface(self.panel_rect.size)
+        self.tiles = OrderedDict()
+        self.walls = None
+        self.costs = None
+        self.start_pos = self.goal_pos = None
+        self.overlay = {}
+        self.fixed_cells = set()
+        self.dirty_rects = []
+        self.transient_rects = []
+        self.view_changed = True
+
+    def set_maze(self, maze, start_pos, goal_pos):
+        self.walls = cell_grid(maze)
+        self.costs = cost_grid(maze)
+        self.rows, self.cols = self.walls.shape
+        self.start_pos, self.goal_pos = tuple(start_pos), tuple(goal_pos)
+        self.fixed_cells = {self.start_pos, self.goal_pos}
+        self.overlay = {}
+        self.fit_view()
+
+    def invalidate(self):
+        # The maze changed in place; cached tiles no longer match it
+        self.tiles.clear()
+        self.view_changed = True
+
+    def fit_view(self):
+        longest = max(self.rows, self.cols)
+        if longest <= MAZE_WIDTH:
+            self.set_zoom(MAZE_WIDTH // longest, 1)
+        else:
+            self.set_zoom(1, -(-longest // MAZE_WIDTH))
+        self.offset = [0, 0]
+
+    def set_zoom(self, cell_size, cells_per_pixel):
+        self.cell_size = cell_size
+        self.cells_per_pixel = cells_per_pixel
+        self.tile_cells = max(1, TILE_SIZE // cell_size)
+        assets.configure((WINDOW_WIDTH, WINDOW_HEIGHT), cell_size)
+        self.tiles.clear()
+        self.view_changed = True
+
+    def zoom(self, steps, anchor=None):
+        # Each step doubles or halves the scale, keeping the cell under anchor in place
+        anchor = anchor or self.view_rect.center
+        world_x = (anchor[0] + self.offset[0]) * self.cells_per_pixel / self.cell_size
+        world_y = (anchor[1] + self.offset[1]) * self.cells_per_pixel / self.cell_size
+        cell_size, cells_per_pixel = self.cell_size, self.cells_per_pixel
+        for _ in range(abs(steps)):
+            if steps > 0:
+                if cells_per_pixel > 1:
+                    cells_per_pixel //= 2
+                elif cell_size < MAX_CELL_SIZE:
+                    cell_size *= 2
+            elif cell_size > 1:
+                cell_size //= 2
+            elif max(self.rows, self.cols) / cells_per_pixel > MAZE_WIDTH:
+                cells_per_pixel *= 2
+        if (cell_size, cells_per_pixel) == (self.cell_size, self.cells_per_pixel):
+            return
+        self.set_zoom(cell_size, cells_per_pixel)
+        self.offset = [world_x * cell_size / cells_per_pixel - anchor[0],
+                       world_y * cell_size / cells_per_pixel - anchor[1]]
+        self.clamp_offset()
+
+    def pan(self, dx, dy):
+        previous = list(self.offset)
+        self.offset[0] += dx
+        self.offset[1] += dy
+        self.clamp_offset()
+        if self.offset != previous:
+            self.view_changed = True
+
+    def clamp_offset(self):
+        world_width, world_height = self.world_size()
+        self.offset[0] = int(max(0, min(self.offset[0], world_width - self.view_rect.width)))
+        self.offset[1] = int(max(0, min(self.offset[1], world_height - self.view_rect.height)))
+
+    def world_size(self):
+        k = self.cells_per_pixel
+        return -(-self.cols // k) * self.cell_size, -(-self.rows // k) * self.cell_size
+
+    def ensure_visible(self, cell, margin=2):
+        rect = self.cell_rect(*cell).inflate(margin * 2 * self.cell_size, margin * 2 * self.cell_size)
+        if self.view_rect.contains(rect):
+            return
+        previous = list(self.offset)
+        self.offset[0] += rect.centerx - self.view_rect.centerx
+        self.offset[1] += rect.centery - self.view_rect.centery
+        self.clamp_offset()
+        if self.offset != previous:
+            self.view_changed = True
+
+    def cell_rect(self, x, y):
+        k = self.cells_per_pixel
+        return pygame.Rect(int(y // k) * self.cell_size - self.offset[0],
+                           int(x // k) * self.cell_size - self.offset[1],
+                           self.cell_size, self.cell_size)
+
+    def screen_to_cell(self, pos):
+        if not self.view_rect.collidepoint(pos):
+            return None
+        k = self.cells_per_pixel
+        x = (pos[1] + self.offset[1]) // self.cell_size * k
+        y = (pos[0] + self.offset[0]) // self.cell_size * k
+        if 0 <= x < self.rows and 0 <= y < self.cols:
+            return x, y
+        return None
+
+    def base_color(self, x, y):
+        if (x, y) == self.start_pos:
+            return START_COLOR
+        if (x, y) == self.goal_pos:
+            return GOAL_COLOR
+        if self.walls[x, y]:
+            return WALL_COLOR
+        if self.costs is not None and self.costs[x, y] > 1:
+            return terrain_color(int(self.costs[x, y]))
+        return PATH_COLOR
+
+    def draw_cell(self, surface, rect, color):
+        if self.cell_size < DETAIL_CELL_SIZE:
+            surface.fill(color[:3], rect)
+        elif color == WALL_COLOR:
+            pygame.draw.rect(surface, color, rect)
+            pygame.draw.rect(surface, (30, 34, 42), rect, 1)
+        else:
+            pygame.draw.rect(surface, color, rect)
+            if color != BACKGROUND:
+                surface.blit(assets.cell_gradient(self.cell_size), rect)
+
+    def draw_grid_lines(self, surface, area, origin=(0, 0)):
+        # Lines sit on world multiples of the cell size; origin is the world position of
+        # the surface's top-left pixel. Only segments inside area are drawn.
+        if self.cell_size < DETAIL_CELL_SIZE or self.cells_per_pixel > 1:
+            return
+        area = area.clip(surface.get_clip())
+        if not area:
+            return
+        cs = self.cell_size
+        left, top = area.left + origin[0], area.top + origin[1]
+        right, bottom = area.right + origin[0], area.bottom + origin[1]
+        for i in range(max(0, -(-left // cs)), min(self.cols, (right - 1) // cs) + 1):
+            x = i * cs - origin[0]
+            pygame.draw.line(surface, (50, 50, 50), (x, area.top), (x, area.bottom - 1))
+        for i in range(max(0, -(-top // cs)), min(self.rows, (bottom - 1) // cs) + 1):
+            y = i * cs - origin[1]
+            pygame.draw.line(surface, (50, 50, 50), (area.left, y), (area.right - 1, y))
+
+    def tile(self, tile_x, tile_y):
+        key = (tile_x, tile_y)
+        surface = self.tiles.get(key)
+        if surface is not None:
+            self.tiles.move_to_end(key)
+            return surface
+        surface = self.render_tile(tile_x, tile_y)
+        self.tiles[key] = surface
+        if len(self.tiles) > MAX_TILES:
+            self.tiles.popitem(last=False)
+        return surface
+
+    def render_tile(self, tile_x, tile_y):
+        n, cs = self.tile_cells, self.cell_size
+        row0, col0 = tile_y * n, tile_x * n
+        row1, col1 = min(self.rows, row0 + n), min(self.cols, col0 + n)
+        if cs < DETAIL_CELL_SIZE:
+            # Too small for gradients and borders: build the pixels with array ops
+            block = self.walls[row0:row1, col0:col1] != 0
+            ground = np.array(PATH_COLOR, np.float32)
+            if self.costs is not None:
+                # Heatmap: blend towards HEAT_COLOR as the terrain cost rises
+                t = np.clip((self.costs[row0:row1, col0:col1] - 1) / (MAX_TERRAIN_COST - 1), 0, 1)
+                ground = ground + (np.array(HEAT_COLOR, np.float32) - ground) * t[..., None]
+            rgb = np.where(block[..., None], np.array(WALL_COLOR, np.uint8), ground.astype(np.uint8))
+            for (x, y), color in ((self.start_pos, START_COLOR), (self.goal_pos, GOAL_COLOR)):
+                if row0 <= x < row1 and col0 <= y < col1:
+                    rgb[x - row0, y - col0] = color
+            rgb = rgb.repeat(cs, axis=0).repeat(cs, axis=1)
+            return pygame.surfarray.make_surface(rgb.transpose(1, 0, 2))
+
+        surface = pygame.Surface(((col1 - col0) * cs, (row1 - row0) * cs))
+        for x in range(row0, row1):
+            for y in range(col0, col1):
+                rect = pygame.Rect((y - col0) * cs, (x - row0) * cs, cs, cs)
+                self.draw_cell(surface, rect, self.base_color(x, y))
+        self.draw_grid_lines(surface, surface.get_rect(), (col0 * cs, row0 * cs))
+        return surface
+
+    def overview(self):
+        # One pixel per k x k block, shaded by the fraction of walls it contains
+        key = ('overview', self.cells_per_pixel)
+        surface = self.tiles.get(key)
+        if surface is not None:
+            return surface
+        k = self.cells_per_pixel
+        rows, cols = -(-self.rows // k) * k, -(-self.cols // k) * k
+        padded = np.ones((rows, cols), dtype=np.float32)
+        padded[:self.rows, :self.cols] = self.walls != 0
+        density = padded.reshape(rows // k, k, cols // k, k).mean(axis=(1, 3))[..., None]
+        rgb = (np.array(PATH_COLOR) * (1 - density) + np.array(WALL_COLOR) * density).astype(np.uint8)
+        for (x, y), color in ((self.start_pos, START_COLOR), (self.goal_pos, GOAL_COLOR)):
+            rgb[x // k, y // k] = color
+        surface = pygame.surfarray.make_surface(rgb.transpose(1, 0, 2))
+        self.tiles[key] = surface
+        return surface
+
+    def restore_cell(self, cell):
+        rect = self.cell_rect(*cell)
+        if not rect.colliderect(self.view_rect):
+            return
+        if self.cells_per_pixel > 1:
+            self.frame.blit(self.overview(), rect, rect.move(self.offset))
+        else:
+            n, cs = self.tile_cells, self.cell_size
+            x, y = cell
+            area = pygame.Rect((y % n) * cs, (x % n) * cs, cs, cs)
+            self.frame.blit(self.tile(y // n, x // n), rect, area)
+        self.dirty_rects.append(rect)
+
+    def compose(self):
+        # Rebuild the visible frame after a pan or zoom; cost depends on the view size only
+        self.frame.fill(BACKGROUND)
+        self.frame.set_clip(self.view_rect)
+        if self.cells_per_pixel > 1:
+            self.frame.blit(self.overview(), (0, 0), self.view_rect.move(self.offset))
+        else:
+            span = self.tile_cells * self.cell_size
+            first_x, first_y = self.offset[0] // span, self.offset[1] // span
+            last_x = min((self.cols - 1) // self.tile_cells, (self.offset[0] + self.view_rect.width) // span)
+            last_y = min((self.rows - 1) // self.tile_cells, (self.offset[1] + self.view_rect.height) // span)
+            for tile_y in range(first_y, last_y + 1):
+                for tile_x in range(first_x, last_x + 1):
+                    self.frame.blit(self.tile(tile_x, tile_y),
+                                    (tile_x * span - self.offset[0], tile_y * span - self.offset[1]))
+            # Closing lines along the far edges of the maze
+            self.draw_grid_lines(self.frame, self.view_rect, self.offset)
+        for cell, color in self.overlay.items():
+            rect = self.cell_rect(*cell)
+            if rect.colliderect(self.view_rect):
+                self.draw_cell(self.frame, rect, color)
+                self.draw_grid_lines(self.frame, rect, self.offset)
+        self.frame.set_clip(None)
+        self.dirty_rects = [self.panel_rect.copy()]
+        self.view_changed = False
+
+    def update_cell(self, cell):
+        # The maze changed at cell: drop the cached renderings that show it and redraw it
+        x, y = cell
+        n = self.tile_cells
+        self.tiles.pop((y // n, x // n), None)
+        for key in [key for key in self.tiles if key[0] == 'overview']:
+            del self.tiles[key]
+        self.overlay.pop(cell, None)
+        if self.view_changed:
+            return
+        self.frame.set_clip(self.view_rect)
+        self.restore_cell(cell)
+        self.frame.set_clip(None)
+
+    def paint_cell(self, cell, color):
+        cell = tuple(cell)
+        if cell in self.fixed_cells or self.overlay.get(cell) == color:
+            return
+        self.overlay[cell] = color
+        rect = self.cell_rect(*cell)
+        if self.view_changed or not rect.colliderect(self.view_rect):
+            return
+        self.frame.set_clip(self.view_rect)
+        self.draw_cell(self.frame, rect, color)
+        self.draw_grid_lines(self.frame, rect, self.offset)
+        self.frame.set_clip(None)
+        self.dirty_rects.append(rect)
+
+    def clear_overlay(self):
+        overlay, self.overlay = self.overlay, {}
+        if self.view_changed:
+            return
+        if len(overlay) > MAX_RESTORED_CELLS:
+            # Past a point, recomposing the view is cheaper than restoring cell by cell
+            self.view_changed = True
+            return
+        self.frame.set_clip(self.view_rect)
+        for cell in overlay:
+            self.restore_cell(cell)
+        self.frame.set_clip(None)
+
+    def add_transient(self, rects):
+        self.transient_rects.extend(rects)
+
+    def draw(self, screen, agent_pos):
+        if self.view_changed:
+            self.compose()
+
+        # Restore whatever the agent and particles covered last frame, then redraw the agent
+        dirty = self.dirty_rects + self.transient_rects
+        for rect in dirty:
+            area = rect.clip(self.panel_rect)
+            screen.blit(self.frame, area, area)
+
+        cs, k = self.cell_size, self.cells_per_pixel
+        agent_x = int(agent_pos[1] / k * cs) - self.offset[0]
+        agent_y = int(agent_pos[0] / k * cs) - self.offset[1]
+        glow_surface = assets.agent_glow(cs)
+
+        agent_area = glow_surface.get_rect(topleft=(agent_x - cs, agent_y - cs))
+        agent_area = agent_area.clip(self.view_rect)
+        screen.set_clip(self.view_rect)
+        screen.blit(glow_surface, (agent_x - cs, agent_y - cs))
+        pygame.draw.rect(screen, AGENT_COLOR, (agent_x, agent_y, cs, cs))
+        self.draw_grid_lines(screen, agent_area, self.offset)
+        screen.set_clip(None)
+
+        dirty.append(agent_area)
+        self.dirty_rects = []
+        self.transient_rects = [agent_area]
+        return dirty
+
+def replay_steps(trace, result):
+    # Step through a cached trace as if the search were running again
+    yield from trace
+    return result
+
+class SearchTask:
+    # A solver run spread across frames. advance() expands cells until the step cap or
+    # the time budget runs out; the solver's result is kept once its generator finishes.
+    def __init__(self, method_id, steps, record=True, elapsed=0.0, store=True):
+        self.method_id = method_id
+        self.steps = steps
+        self.record = record
+        self.store = store
+        self.trace = array('i')
+        self.expanded = 0
+        self.elapsed = elapsed
+        self.paused = False
+        self.result = None
+
+    @property
+    def done(self):
+        return self.result is not None
+
+    def advance(self, budget, max_steps=None, visit=None):
+        if self.paused or self.done:
+            return
+        step = self.steps.__next__
+        limit = max_steps
+        expanded = 0
+        deadline = time.perf_counter() + budget
+        while not self.done and (limit is None or expanded < limit):
+            # Expand a small batch, then paint it; only the expansions count as search time
+            batch = array('i')
+            begin = time.perf_counter()
+            try:
+                for _ in range(64 if limit is None else min(64, limit - expanded)):
+                    batch.append(step())
+            except StopIteration as finished:
+                self.result = finished.value
+            now = time.perf_counter()
+            if self.record:
+                self.elapsed += now - begin
+                self.trace.extend(batch)
+            expanded += len(batch)
+            if visit:
+                for index in batch:
+                    visit(index)
+                now = time.perf_counter()
+            if now >= deadline:
+                break
+        self.expanded += expanded
+
+class AgentMotion:
+    # Moves the agent through a list of cells, one frames_per_cell interpolation each
+    def __init__(self, start, path, frames_per_cell, solution=True):
+        self.previous = tuple(start)
+        self.path = path
+        self.frames_per_cell = frames_per_cell
+        self.solution = solution
+        self.index = 0
+        self.frame = 0
+
+    @property
+    def done(self):
+        return self.index >= len(self.path)
+
+    @property
+    def target(self):
+        return tuple(self.path[self.index])
+
+    def advance(self):
+        # Returns the agent's position this frame and the cell reached, if any
+        target = self.target
+        self.frame += 1
+        if self.frame < self.frames_per_cell:
+            progress = self.frame / self.frames_per_cell
+            return [self.previous[0] + (target[0] - self.previous[0]) * progress,
+                    self.previous[1] + (target[1] - self.previous[1]) * progress], None
+        self.previous = target
+        self.index += 1
+        self.frame = 0
+        return list(target), target
 
 class SolutionTime:
-    def __init__(self, method, time, path_length, nodes_visited):
+    def __init__(self, method, time, path_length, nodes_visited, path_cost=None):
         self.method = method
         self.time = time
         self.path_length = path_length
         self.nodes_visited = nodes_visited
+        self.path_cost = path_cost
         self.timestamp = pygame.time.get_ticks()
 
 class MazeGame:
-    def __init__(self):
+    def __init__(self, maze_file=None):
         self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
         pygame.display.set_caption("Maze Pathfinding Visualizer")
         
-        self.maze = self.generate_maze(GRID_SIZE)
-        self.start_pos = (1, 1)
-        self.goal_pos = (GRID_SIZE - 2, GRID_SIZE - 2)
-        self.agent_pos = list(self.start_pos)
-        
+        self.maze_file = maze_file or MAZE_FILE
+        self.maze = None
+        self.maze_key = None
+        self.solution_cache = SolutionCache()
         self.particles = ParticleSystem()
-        self.solution_time = None
-        self.manual_mode = False
-        self.user_start_time = None
+        self.renderer = MazeRenderer()
+        # Default to as many steps as fit in the frame budget; [ slows the search down
+        self.search_speed = len(SEARCH_SPEEDS) - 1
+        self.show_profile = False
+        if maze_file:
+            self.load_maze()
+        else:
+            self.set_maze(generate_maze(GRID_SIZE), (1, 1), (GRID_SIZE - 2, GRID_SIZE - 2))
         
         sidebar_x = MAZE_WIDTH + 20
         button_width = SIDEBAR_WIDTH - 40
-        button_height = 50
-        self.buttons = {
-            'bfs': ModernButton(sidebar_x, 50, button_width, button_height, "BFS"),
-            'dfs': ModernButton(sidebar_x, 120, button_width, button_height, "DFS"),
-            'astar_manhattan': ModernButton(sidebar_x, 190, button_width, button_height, "A* Manhattan"),
-            'astar_euclidean': ModernButton(sidebar_x, 260, button_width, button_height, "A* Euclidean"),
-            'manual': ModernButton(sidebar_x, 330, button_width, button_height, "Manual Mode"),
-            'new_maze': ModernButton(sidebar_x, WINDOW_HEIGHT - 70, button_width, button_height,
-                                   "New Maze", NEW_MAZE_BUTTON_COLOR, NEW_MAZE_HOVER_COLOR)
-        }
-
-    def generate_maze(self, size):
-        maze = [[1 for _ in range(size)] for _ in range(size)]
-        
-        def carve_passages(cx, cy):
-            directions = [(0, 2), (0, -2), (2, 0), (-2, 0)]
-            random.shuffle(directions)
-            
-            for dx, dy in directions:
-                nx, ny = cx + dx, cy + dy
-                if 0 < nx < size - 1 and 0 < ny < size - 1 and maze[ny][nx] == 1:
-                    maze[cy + dy // 2][cx + dx // 2] = 0
-                    maze[ny][nx] = 0
-                    carve_passages(nx, ny)
-        
-        maze[1][1] = 0
-        carve_passages(1, 1)
-        maze[size - 2][size - 2] = 0
-        return maze
+        button_height = 40
+        button_spacing = 48
+        self.buttons = {}
+        for i, (solver_id, method) in enumerate(SEARCH_LABELS.items()):
+            self.buttons[solver_id] = ModernButton(sidebar_x, 20 + i * button_spacing,
+                                                   button_width, button_height, method)
+        manual_y = 20 + len(SEARCH_LABELS) * button_spacing
+        self.buttons['manual'] = ModernButton(sidebar_x, manual_y, button_width, button_height, "Manual Mode")
+        half_width = (button_width - 10) // 2
+        self.buttons['save'] = ModernButton(sidebar_x, WINDOW_HEIGHT - 120, half_width, button_height, "Save")
+        self.buttons['load'] = ModernButton(sidebar_x + half_width + 10, WINDOW_HEIGHT - 120,
+                                            half_width, button_height, "Load")
+        self.buttons['new_maze'] = ModernButton(sidebar_x, WINDOW_HEIGHT - 70, button_width, 50,
+                                                "New Maze", NEW_MAZE_BUTTON_COLOR, NEW_MAZE_HOVER_COLOR)
+        self.stats_y = manual_y + button_spacing + 10
+
+    def set_maze(self, maze, start_pos, goal_pos):
+        self.mark_maze_changed()
+        self.maze = maze
+        self.start_pos = tuple(start_pos)
+        self.goal_pos = tuple(goal_pos)
+        self.renderer.set_maze(self.maze, self.start_pos, self.goal_pos)
+        self.agent_pos = list(self.start_pos)
+        self.search = None
+        self.motion = None
+        self.reset_agent_at = None
+        self.planner = None
+        self.cluster_graph = None
+        self.replan_after_edit = False
+        self.edit_value = None
+        self.solution_time = None
+        self.user_start_time = None
+        self.manual_mode = False
+
+    def load_maze(self):
+        try:
+            maze, start_pos, goal_pos = read_maze(self.maze_file)
+        except (OSError, MazeFileError) as error:
+            print(f"Could not load {self.maze_file}: {error}", file=sys.stderr)
+            if self.maze is None:
+                self.set_maze(generate_maze(GRID_SIZE), (1, 1), (GRID_SIZE - 2, GRID_SIZE - 2))
+            return
+        self.set_maze(maze, start_pos, goal_pos)
+        try:
+            self.cluster_graph = ClusterGraph.load(graph_file(self.maze_file), self.maze)
+        except FileNotFoundError:
+            pass
+        except (OSError, MazeFileError) as error:
+            print(f"Ignoring cluster graph: {error}", file=sys.stderr)
 
     def format_time(self, seconds):
         minutes = int(seconds // 60)
@@ -185,209 +788,257 @@ class MazeGame:
             return f"{minutes}m {seconds:.1f}s"
         return f"{seconds:.3f}s"
 
-    def bfs_solve(self, start, goal):
-        queue = deque([start])
-        visited = set()
-        parent_map = {}
-        nodes_visited = 0
-
-        while queue:
-            current = queue.popleft()
-            if current in visited:
-                continue
-            visited.add(current)
-            nodes_visited += 1
-
-            self.draw_maze(visited=visited)
-            pygame.display.flip()
-            pygame.time.delay(50)
-
-            if current == goal:
-                path = []
-                while current:
-                    path.append(current)
-                    current = parent_map.get(current)
-                return path[::-1], nodes_visited
-
-            x, y = current
-            for dx, dy in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
-                nx, ny = x + dx, y + dy
-                if (0 <= nx < GRID_SIZE and 0 <= ny < GRID_SIZE and 
-                    (nx, ny) not in visited and self.maze[nx][ny] == 0):
-                    queue.append((nx, ny))
-                    parent_map[(nx, ny)] = current
-        return [], nodes_visited
-
-    def dfs_solve(self, start, goal):
-        stack = [start]
-        visited = set()
-        parent_map = {}
-        nodes_visited = 0
-
-        while stack:
-            current = stack.pop()
-            if current in visited:
-                continue
-            visited.add(current)
-            nodes_visited += 1
-
-            self.draw_maze(visited=visited)
-            pygame.display.flip()
-            pygame.time.delay(50)
-
-            if current == goal:
-                path = []
-                while current:
-                    path.append(current)
-                    current = parent_map.get(current)
-                return path[::-1], nodes_visited
-
-            x, y = current
-            for dx, dy in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
-                nx, ny = x + dx, y + dy
-                if (0 <= nx < GRID_SIZE and 0 <= ny < GRID_SIZE and 
-                    (nx, ny) not in visited and self.maze[nx][ny] == 0):
-                    stack.append((nx, ny))
-                    parent_map[(nx, ny)] = current
-        return [], nodes_visited
-
-    def heuristic_manhattan(self, node, goal):
-        return abs(node[0] - goal[0]) + abs(node[1] - goal[1])
-
-    def heuristic_euclidean(self, node, goal):
-        return math.sqrt((node[0] - goal[0])**2 + (node[1] - goal[1])**2)
-
-    def astar_solve(self, start, goal, heuristic_func):
-        p_queue = [(0, start)]
-        visited = set()
-        parent_map = {}
-        g_score_map = {start: 0}
-        nodes_visited = 0
-
-        while p_queue:
-            _, current = heapq.heappop(p_queue)
-            if current in visited:
-                continue
-            visited.add(current)
-            nodes_visited += 1
-
-            self.draw_maze(visited=visited)
-            pygame.display.flip()
-            pygame.time.delay(50)
-
-            if current == goal:
-                path = []
-                while current:
-                    path.append(current)
-                    current = parent_map.get(current)
-                return path[::-1], nodes_visited
-
-            x, y = current
-            for dx, dy in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
-                nx, ny = x + dx, y + dy
-                if (0 <= nx < GRID_SIZE and 0 <= ny < GRID_SIZE and 
-                    (nx, ny) not in visited and self.maze[nx][ny] == 0):
-                    g_score = g_score_map[current] + 1
-                    if (nx, ny) not in g_score_map or g_score < g_score_map[(nx, ny)]:
-                        g_score_map[(nx, ny)] = g_score
-                        f_score = g_score + heuristic_func((nx, ny), goal)
-                        heapq.heappush(p_queue, (f_score, (nx, ny)))
-                        parent_map[(nx, ny)] = current
-        return [], nodes_visited
-
-    def move_agent_along_path(self, path):
-        for next_pos in path:
-            start_x, start_y = self.agent_pos
-            end_x, end_y = next_pos
-            
-            for t in range(TRANSITION_SPEED + 1):
-                progress = t / TRANSITION_SPEED
-                current_x = start_x + (end_x - start_x) * progress
-                current_y = start_y + (end_y - start_y) * progress
-                self.agent_pos = [current_x, current_y]
-                
-                self.screen.fill(BACKGROUND)
-                self.draw_maze(path=path)
-                self.draw_sidebar()
-                pygame.display.flip()
-                pygame.time.delay(20)
-
-            self.agent_pos = list(next_pos)
-            # Create particles at agent position
-            screen_x = self.agent_pos[1] * CELL_SIZE + CELL_SIZE // 2
-            screen_y = self.agent_pos[0] * CELL_SIZE + CELL_SIZE // 2
-            for _ in range(3):
-                self.particles.create_particle((screen_x, screen_y), AGENT_COLOR)
+    def start_search(self, button_id):
+        self.cancel_search()
+        self.manual_mode = False
+        self.replan_after_edit = button_id == 'lpastar'
+        if button_id == 'lpastar':
+            # The planner keeps its state across wall edits, so only repairs are searched
+            if self.planner is None:
+                self.planner = LPAStar(self.maze, self.start_pos, self.goal_pos)
+            self.search = SearchTask(button_id, self.planner.replan_steps(), store=False)
+            return
+        if button_id == 'hpa':
+            self.search = SearchTask(button_id, self.hpa_steps(), store=False)
+            return
+        lookup_start = time.perf_counter()
+        cached = self.solution_cache.lookup(button_id, self.current_maze_key(), self.start_pos,
+                                            self.goal_pos)
+        if cached is None:
+            steps = solve_steps(button_id, self.maze, self.start_pos, self.goal_pos)
+            self.search = SearchTask(button_id, steps)
+        else:
+            path, nodes_visited, trace = cached
+            self.search = SearchTask(button_id, replay_steps(trace, (path, nodes_visited)),
+                                     record=False, elapsed=time.perf_counter() - lookup_start)
+
+    def current_maze_key(self):
+        # Hashing a large maze takes tens of milliseconds, so edits only mark the key
+        # stale and it is recomputed once the solution cache is next used
+        if self.maze_key is None:
+            self.maze_key = maze_key(self.maze)
+        return self.maze_key
+
+    def mark_maze_changed(self):
+        if self.maze_key is not None:
+            self.solution_cache.invalidate_maze(self.maze_key)
+            self.maze_key = None
+
+    def hpa_steps(self):
+        # The cluster graph is built on first use, spread over frames like a search
+        if self.cluster_graph is None:
+            graph = ClusterGraph(self.maze, build=False)
+            yield from graph.build_steps()
+            self.cluster_graph = graph
+        return (yield from self.cluster_graph.solve_steps(self.start_pos, self.goal_pos))
+
+    def cancel_search(self):
+        self.search = None
+        self.motion = None
+        self.reset_agent_at = None
+        self.agent_pos = list(self.start_pos)
+        self.renderer.clear_overlay()
+
+    def update_search(self):
+        task = self.search
+        if task is None or task.paused:
+            return
+        cols = self.renderer.cols
+        paint_cell = self.renderer.paint_cell
+        expanded = task.expanded
+        task.advance(SEARCH_TIME_BUDGET, SEARCH_SPEEDS[self.search_speed],
+                     lambda index: paint_cell(divmod(index, cols), VISITED_COLOR))
+        if profiler.enabled:
+            profiler.count('expansions', task.expanded - expanded)
+        if task.done:
+            self.finish_search()
+
+    def finish_search(self):
+        task, self.search = self.search, None
+        path, nodes_visited = task.result
+        if task.record and task.store:
+            self.solution_cache.store(task.method_id, self.current_maze_key(), self.start_pos,
+                                      self.goal_pos, path, nodes_visited, task.trace)
+        method = SEARCH_LABELS[task.method_id]
+        cost = path_cost(self.maze, path) if self.maze.costs is not None else None
+        self.solution_time = SolutionTime(method, task.elapsed, len(path), nodes_visited, cost)
+        self.renderer.clear_overlay()
+        for cell in path:
+            self.renderer.paint_cell(cell, SOLUTION_COLOR)
+        if path:
+            self.motion = AgentMotion(self.agent_pos, list(path), TRANSITION_SPEED)
+
+    def edit_cell(self, cell, value):
+        # Border, start, goal and the agent's cells stay as they are
+        x, y = cell
+        if not (0 < x < len(self.maze) - 1 and 0 < y < len(self.maze[0]) - 1):
+            return
+        agent_cells = {tuple(map(round, self.agent_pos))}
+        if self.motion is not None:
+            agent_cells.add(self.motion.target)
+        if cell in (self.start_pos, self.goal_pos) or cell in agent_cells:
+            return
+        if self.maze[x][y] == value:
+            return
+        if self.search is not None or (self.motion is not None and self.motion.solution):
+            self.cancel_search()
+        self.maze[x][y] = value
+        self.mark_maze_changed()
+        self.renderer.update_cell(cell)
+        if self.cluster_graph is not None:
+            self.cluster_graph.update_cell(x, y)
+        if self.planner is not None:
+            self.planner.update_cell(x, y)
+            if self.replan_after_edit:
+                self.start_search('lpastar')
+
+    def toggle_terrain(self):
+        # Adds random terrain costs to the maze, or removes them again
+        self.cancel_search()
+        if self.maze.costs is None:
+            add_terrain(self.maze)
+        else:
+            self.maze.costs = None
+        self.mark_maze_changed()
+        self.renderer.costs = cost_grid(self.maze)
+        self.renderer.invalidate()
+
+    def handle_edit_event(self, event):
+        # Left click toggles a wall; dragging paints the same state over more cells.
+        # T toggles weighted terrain.
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_t:
+            self.toggle_terrain()
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            cell = self.renderer.screen_to_cell(event.pos)
+            if cell is None or self.renderer.cells_per_pixel > 1:
+                return
+            self.edit_value = PASSAGE if self.maze[cell[0]][cell[1]] else WALL
+            self.edit_cell(cell, self.edit_value)
+        elif (event.type == pygame.MOUSEMOTION and event.buttons[0] and self.edit_value is not None
+              and self.renderer.cells_per_pixel == 1):
+            cell = self.renderer.screen_to_cell(event.pos)
+            if cell is not None:
+                self.edit_cell(cell, self.edit_value)
+        elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+            self.edit_value = None
+
+    def update_motion(self):
+        if self.reset_agent_at is not None and pygame.time.get_ticks() >= self.reset_agent_at:
+            self.agent_pos = list(self.start_pos)
+            self.user_start_time = None
+            self.reset_agent_at = None
+        motion = self.motion
+        if motion is None:
+            return
+        self.renderer.ensure_visible(motion.target)
+        self.agent_pos, reached = motion.advance()
+        if reached is None:
+            return
+        if motion.solution:
+            screen_pos = self.renderer.cell_rect(*reached).center
+            self.particles.emit(screen_pos, AGENT_COLOR, 3)
+        if not motion.done:
+            return
+        self.motion = None
+        if motion.solution:
+            self.renderer.clear_overlay()
+        elif reached == self.goal_pos and self.manual_mode:
+            solve_time = time.perf_counter() - self.user_start_time
+            self.solution_time = SolutionTime("Manual", solve_time, 0, 0)
+            self.reset_agent_at = pygame.time.get_ticks() + RESET_DELAY
 
     def try_move(self, dx, dy):
+        # One move at a time; keys pressed mid-move or while the agent resets are dropped
+        if self.motion is not None or self.reset_agent_at is not None:
+            return
         if self.user_start_time is None and self.manual_mode:
-            self.user_start_time = time.time()
+            self.user_start_time = time.perf_counter()
         
         new_x = self.agent_pos[0] + dx
         new_y = self.agent_pos[1] + dy
         
-        if (0 <= new_x < GRID_SIZE and 0 <= new_y < GRID_SIZE and 
+        if (0 <= new_x < len(self.maze) and 0 <= new_y < len(self.maze[0]) and 
             self.maze[new_x][new_y] == 0):
-            start_x, start_y = self.agent_pos
-            for t in range(TRANSITION_SPEED + 1):
-                progress = t / TRANSITION_SPEED
-                current_x = start_x + dx * progress
-                current_y = start_y + dy * progress
-                self.agent_pos = [current_x, current_y]
-                
-                self.screen.fill(BACKGROUND)
-                self.draw_maze()
-                self.draw_sidebar()
-                pygame.display.flip()
-                pygame.time.delay(5)
-            
-            self.agent_pos = [new_x, new_y]
-            
-            if (new_x, new_y) == self.goal_pos and self.manual_mode:
-                end_time = time.time()
-                solve_time = end_time - self.user_start_time
-                self.solution_time = SolutionTime("Manual", solve_time, 0, 0)
-                pygame.time.delay(500)
-                self.agent_pos = list(self.start_pos)
-                self.user_start_time = None
+            self.motion = AgentMotion(self.agent_pos, [(new_x, new_y)], MANUAL_TRANSITION_SPEED,
+                                      solution=False)
 
     def handle_button_click(self, button_id):
-        if button_id == 'bfs':
-            path, nodes_visited = self.bfs_solve(self.start_pos, self.goal_pos)
-            solve_time = time.time()
-            self.solution_time = SolutionTime("BFS", solve_time, len(path), nodes_visited)
-            self.move_agent_along_path(path)
-            
-        elif button_id == 'dfs':
-            path, nodes_visited = self.dfs_solve(self.start_pos, self.goal_pos)
-            solve_time = time.time()
-            self.solution_time = SolutionTime("DFS", solve_time, len(path), nodes_visited)
-            self.move_agent_along_path(path)
-            
-        elif button_id == 'astar_manhattan':
-            path, nodes_visited = self.astar_solve(self.start_pos, self.goal_pos, self.heuristic_manhattan)
-            solve_time = time.time()
-            self.solution_time = SolutionTime("A* Manhattan", solve_time, len(path), nodes_visited)
-            self.move_agent_along_path(path)
-            
-        elif button_id == 'astar_euclidean':
-            path, nodes_visited = self.astar_solve(self.start_pos, self.goal_pos, self.heuristic_euclidean)
-            solve_time = time.time()
-            self.solution_time = SolutionTime("A* Euclidean", solve_time, len(path), nodes_visited)
-            self.move_agent_along_path(path)
+        if button_id in SEARCH_LABELS:
+            self.start_search(button_id)
             
         elif button_id == 'manual':
+            self.cancel_search()
             self.manual_mode = True
-            self.agent_pos = list(self.start_pos)
             self.user_start_time = None
             self.solution_time = None
             
+        elif button_id == 'save':
+            save_maze(self.maze_file, self.maze, self.start_pos, self.goal_pos)
+            if self.cluster_graph is not None:
+                self.cluster_graph.save(graph_file(self.maze_file))
+
+        elif button_id == 'load':
+            self.load_maze()
+
         elif button_id == 'new_maze':
-            self.maze = self.generate_maze(GRID_SIZE)
-            self.agent_pos = list(self.start_pos)
-            self.solution_time = None
-            self.user_start_time = None
-            self.manual_mode = False
+            self.set_maze(generate_maze(GRID_SIZE), (1, 1), (GRID_SIZE - 2, GRID_SIZE - 2))
+
+    def handle_search_event(self, event):
+        # Space pauses, Escape cancels, [ and ] change how many cells are expanded per frame
+        if event.type != pygame.KEYDOWN or self.search is None:
+            return
+        if event.key == pygame.K_SPACE:
+            self.search.paused = not self.search.paused
+        elif event.key == pygame.K_ESCAPE:
+            self.cancel_search()
+        elif event.key == pygame.K_LEFTBRACKET:
+            self.search_speed = max(0, self.search_speed - 1)
+        elif event.key == pygame.K_RIGHTBRACKET:
+            self.search_speed = min(len(SEARCH_SPEEDS) - 1, self.search_speed + 1)
+
+    def handle_view_event(self, event):
+        # Mouse wheel or +/- zooms, right/middle drag or WASD pans, 0 fits the maze
+        if event.type == pygame.MOUSEWHEEL:
+            mouse_pos = pygame.mouse.get_pos()
+            anchor = mouse_pos if self.renderer.view_rect.collidepoint(mouse_pos) else None
+            self.renderer.zoom(event.y, anchor)
+        elif event.type == pygame.MOUSEMOTION and (event.buttons[1] or event.buttons[2]):
+            self.renderer.pan(-event.rel[0], -event.rel[1])
+        elif event.type == pygame.KEYDOWN:
+            if event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                self.renderer.zoom(1)
+            elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                self.renderer.zoom(-1)
+            elif event.key == pygame.K_0:
+                self.renderer.fit_view()
+            elif event.key == pygame.K_w:
+                self.renderer.pan(0, -PAN_STEP)
+            elif event.key == pygame.K_s:
+                self.renderer.pan(0, PAN_STEP)
+            elif event.key == pygame.K_a:
+                self.renderer.pan(-PAN_STEP, 0)
+            elif event.key == pygame.K_d:
+                self.renderer.pan(PAN_STEP, 0)
+
+    def handle_profile_event(self, event):
+        # F3 shows the performance overlay, F4 starts or stops a Chrome trace recording
+        if event.type != pygame.KEYDOWN:
+            return
+        if event.key == pygame.K_F3:
+            self.show_profile = not self.show_profile
+            if self.show_profile:
+                profiler.enable()
+            elif not profiler.recording:
+                profiler.disable()
+        elif event.key == pygame.K_F4:
+            if not profiler.recording:
+                profiler.start_recording()
+                return
+            profiler.stop_recording()
+            count = profiler.export_trace(PROFILE_TRACE_FILE)
+            print(f"Wrote {count} trace events to {PROFILE_TRACE_FILE}", file=sys.stderr)
+            if not self.show_profile:
+                profiler.disable()
 
     def handle_keyboard_input(self, key):
         if key == pygame.K_UP:
@@ -399,88 +1050,35 @@ class MazeGame:
         elif key == pygame.K_RIGHT:
             self.try_move(0, 1)
 
-    def draw_cell(self, x, y, color, surface=None):
-        if surface is None:
-            surface = self.screen
-            
-        rect = pygame.Rect(y * CELL_SIZE, x * CELL_SIZE, CELL_SIZE, CELL_SIZE)
-        if color == WALL_COLOR:
-            pygame.draw.rect(surface, color, rect)
-            pygame.draw.rect(surface, (30, 34, 42), rect, 1)
-        else:
-            pygame.draw.rect(surface, color, rect)
-            if color != BACKGROUND:
-                gradient = pygame.Surface((CELL_SIZE, CELL_SIZE), pygame.SRCALPHA)
-                pygame.draw.rect(gradient, (255, 255, 255, 20), gradient.get_rect())
-                surface.blit(gradient, rect)
-
-    def draw_maze(self, visited=set(), path=[]):
-        maze_surface = pygame.Surface((MAZE_WIDTH, MAZE_WIDTH))
-        maze_surface.fill(BACKGROUND)
-        
-        for row_idx, row in enumerate(self.maze):
-            for col_idx, cell in enumerate(row):
-                if cell == 1:
-                    self.draw_cell(row_idx, col_idx, WALL_COLOR, maze_surface)
-                elif (row_idx, col_idx) in visited:
-                    self.draw_cell(row_idx, col_idx, VISITED_COLOR, maze_surface)
-                elif (row_idx, col_idx) in path:
-                    self.draw_cell(row_idx, col_idx, SOLUTION_COLOR, maze_surface)
-                else:
-                    self.draw_cell(row_idx, col_idx, PATH_COLOR, maze_surface)
-
-        self.draw_cell(self.start_pos[0], self.start_pos[1], START_COLOR, maze_surface)
-        self.draw_cell(self.goal_pos[0], self.goal_pos[1], GOAL_COLOR, maze_surface)
-
-        # Draw agent with glow effect
-        agent_x = int(self.agent_pos[1] * CELL_SIZE)
-        agent_y = int(self.agent_pos[0] * CELL_SIZE)
-        
-        glow_surface = pygame.Surface((CELL_SIZE * 3, CELL_SIZE * 3), pygame.SRCALPHA)
-        for radius in range(CELL_SIZE * 2, 0, -2):
-            alpha = int(100 * (radius / (CELL_SIZE * 2)))
-            pygame.draw.circle(glow_surface, (*AGENT_COLOR[:3], alpha), 
-                             (CELL_SIZE * 1.5, CELL_SIZE * 1.5), radius)
-        
-        maze_surface.blit(glow_surface, (agent_x - CELL_SIZE, agent_y - CELL_SIZE))
-        pygame.draw.rect(maze_surface, AGENT_COLOR, (agent_x, agent_y, CELL_SIZE, CELL_SIZE))
-
-        # Grid overlay
-        for i in range(GRID_SIZE + 1):
-            pygame.draw.line(maze_surface, (50, 50, 50), 
-                           (i * CELL_SIZE, 0), 
-                           (i * CELL_SIZE, MAZE_WIDTH))
-            pygame.draw.line(maze_surface, (50, 50, 50), 
-                           (0, i * CELL_SIZE), 
-                           (MAZE_WIDTH, i * CELL_SIZE))
-
-        self.screen.blit(maze_surface, (0, 0))
+    def draw_frame(self):
+        # Only the regions that changed since the last frame are pushed to the display
+        dirty = self.renderer.draw(self.screen, self.agent_pos)
+        dirty.append(self.draw_sidebar())
+        particle_rects = self.particles.draw(self.screen)
+        self.renderer.add_transient(particle_rects)
+        dirty.extend(particle_rects)
+        if self.show_profile:
+            overlay_rect = self.draw_profile_overlay()
+            self.renderer.add_transient([overlay_rect])
+            dirty.append(overlay_rect)
+        pygame.display.update(dirty)
 
     def draw_sidebar(self):
-        sidebar_surface = pygame.Surface((SIDEBAR_WIDTH, WINDOW_HEIGHT))
-        for y in range(WINDOW_HEIGHT):
-            alpha = int(255 * (1 - y / WINDOW_HEIGHT))
-            pygame.draw.line(sidebar_surface, (*BACKGROUND, alpha), 
-                           (0, y), (SIDEBAR_WIDTH, y))
-        self.screen.blit(sidebar_surface, (MAZE_WIDTH, 0))
+        self.screen.blit(assets.sidebar_background(SIDEBAR_WIDTH, WINDOW_HEIGHT), (MAZE_WIDTH, 0))
 
         for button in self.buttons.values():
             button.draw(self.screen)
 
-        if self.solution_time:
+        if self.search:
+            self.draw_search_status()
+        elif self.solution_time:
             self.draw_solution_stats()
+        return pygame.Rect(MAZE_WIDTH, 0, SIDEBAR_WIDTH, WINDOW_HEIGHT)
 
     def draw_solution_stats(self):
         if not self.solution_time:
             return
             
-        font = pygame.font.Font(None, 32)
-        small_font = pygame.font.Font(None, 24)
-        
-        stats_surface = pygame.Surface((SIDEBAR_WIDTH - 40, 100), pygame.SRCALPHA)
-        pygame.draw.rect(stats_surface, (*BUTTON_COLOR, 200), 
-                        stats_surface.get_rect(), border_radius=10)
-        
         y_offset = 10
         stats = [
             f"{self.solution_time.method}",
@@ -488,20 +1086,65 @@ class MazeGame:
             f"Path Length: {self.solution_time.path_length}",
             f"Nodes Visited: {self.solution_time.nodes_visited}"
         ]
+        if self.solution_time.path_cost is not None:
+            stats.append(f"Path Cost: {self.solution_time.path_cost}")
+
+        panel_height = 100 + 25 * (len(stats) - 4)
+        stats_surface = assets.rounded_overlay(SIDEBAR_WIDTH - 40, panel_height, (*BUTTON_COLOR, 200))
+        self.screen.blit(stats_surface, (MAZE_WIDTH + 20, self.stats_y))
         
         for i, stat in enumerate(stats):
             color = BUTTON_TEXT_COLOR if i == 0 else (200, 200, 200)
-            text = (font if i == 0 else small_font).render(stat, True, color)
-            stats_surface.blit(text, (10, y_offset))
+            text = assets.text(stat, 32 if i == 0 else 24, color)
+            self.screen.blit(text, (MAZE_WIDTH + 30, self.stats_y + y_offset))
             y_offset += 25
-            
-        self.screen.blit(stats_surface, (MAZE_WIDTH + 20, 400))
+
+    def draw_search_status(self):
+        stats_surface = assets.rounded_overlay(SIDEBAR_WIDTH - 40, 100, (*BUTTON_COLOR, 200))
+        self.screen.blit(stats_surface, (MAZE_WIDTH + 20, self.stats_y))
+
+        speed = SEARCH_SPEEDS[self.search_speed]
+        stats = [
+            SEARCH_LABELS[self.search.method_id],
+            "Paused" if self.search.paused else "Searching...",
+            f"Nodes Expanded: {self.search.expanded}",
+            f"Speed: {speed}/frame" if speed else "Speed: max",
+        ]
+
+        y_offset = 10
+        for i, stat in enumerate(stats):
+            color = BUTTON_TEXT_COLOR if i == 0 else (200, 200, 200)
+            text = assets.text(stat, 32 if i == 0 else 24, color)
+            self.screen.blit(text, (MAZE_WIDTH + 30, self.stats_y + y_offset))
+            y_offset += 25
+
+    def draw_profile_overlay(self):
+        summary = profiler.summary()
+        lines = ["REC" if profiler.recording else "Profiling"]
+        if summary:
+            lines.append(f"FPS {summary['fps']:.1f}")
+            lines.append(f"Frame p50 {summary['p50_ms']:.2f} ms  p99 {summary['p99_ms']:.2f} ms")
+            lines.extend(f"{name} {ms:.2f} ms" for name, ms in summary['stages_ms'].items())
+            lines.extend(f"{name} {value:.1f}" for name, value in summary['counters'].items())
+        font = assets.font(20)
+        rendered = [font.render(line, True, BUTTON_TEXT_COLOR) for line in lines]
+        # Widths are rounded so the cached background is reused as the numbers change
+        width = -(-(max(text.get_width() for text in rendered) + 16) // 40) * 40
+        height = len(rendered) * 18 + 10
+        rect = pygame.Rect(10, 10, width, height).clip(self.renderer.view_rect)
+        self.screen.set_clip(rect)
+        self.screen.blit(assets.rounded_overlay(width, height, (0, 0, 0, 170), 6), rect)
+        for i, text in enumerate(rendered):
+            self.screen.blit(text, (rect.x + 8, rect.y + 6 + i * 18))
+        self.screen.set_clip(None)
+        return rect
 
     def run(self):
         clock = pygame.time.Clock()
         running = True
         
         while running:
+            profiler.begin_frame()
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     running = False
@@ -512,21 +1155,33 @@ class MazeGame:
                 
                 if self.manual_mode and event.type == pygame.KEYDOWN:
                     self.handle_keyboard_input(event.key)
+                self.handle_search_event(event)
+                self.handle_edit_event(event)
+                self.handle_profile_event(event)
+                self.handle_view_event(event)
             
+            self.update_search()
+            self.update_motion()
             self.particles.update()
             
-            self.screen.fill(BACKGROUND)
-            self.draw_maze()
-            self.draw_sidebar()
-            self.particles.draw(self.screen)
-            
-            pygame.display.flip()
+            self.draw_frame()
             clock.tick(60)
+            profiler.end_frame()
         
         pygame.quit()
         sys.exit()
 
+# Stages shown in the profiling overlay; the hooks are only installed while it is on
+profiler.hook(MazeRenderer, 'draw', 'draw_maze')
+profiler.hook(MazeRenderer, 'compose')
+profiler.hook(MazeRenderer, 'render_tile')
+profiler.hook(MazeRenderer, 'draw_cell', trace=False)
+profiler.hook(MazeGame, 'draw_sidebar')
+profiler.hook(ParticleSystem, 'update', 'particles_update')
+profiler.hook(ParticleSystem, 'draw', 'particles_draw')
+profiler.hook(SearchTask, 'advance', 'search')
+
 # Create and run game
 if __name__ == "__main__":
-    game = MazeGame()
+    game = MazeGame(sys.argv[1] if len(sys.argv) > 1 else None)
     game.run()
\ No newline at end of file
@@ -0,0 +1,256 @@
+import argparse
+from itertools import islice
+import mmap
+import random
+import struct
+import sys
+
+import numpy as np
+
+from mazegen import GENERATORS, Maze, eller_rows, odd_size
+
+MAGIC = b'MAZB'
+VERSION = 1
+# magic, version, flags, rows, cols, seed, start x/y, goal x/y
+HEADER = struct.Struct('<4sBB2xIIQIIII')
+HAS_SEED = 0x01
+# Terrain costs follow the bits, one byte per cell
+HAS_COSTS = 0x02
+ROWS_PER_CHUNK = 4096
+CELLS_PER_CHUNK = 1 << 22
+
+
+class MazeFileError(ValueError):
+    pass
+
+
+class _BitRow:
+    __slots__ = ('bits', 'offset', 'cols')
+
+    def __init__(self, bits, offset, cols):
+        self.bits = bits
+        self.offset = offset
+        self.cols = cols
+
+    def __len__(self):
+        return self.cols
+
+    def __getitem__(self, col):
+        if not 0 <= col < self.cols:
+            raise IndexError(col)
+        index = self.offset + col
+        return (self.bits[index >> 3] >> (7 - (index & 7))) & 1
+
+    def __iter__(self):
+        for col in range(self.cols):
+            yield self[col]
+
+
+class BitMaze:
+    # Read-only maze over one bit per cell (1 = wall), usually a memory-mapped file.
+    # Supports maze[x][y] so the solvers can run on it without unpacking.
+    def __init__(self, rows, cols, bits, seed=None, start=None, goal=None, mapping=None, costs=None):
+        self.rows = rows
+        self.cols = cols
+        self.bits = bits
+        self.costs = costs
+        self.seed = seed
+        self.start = start
+        self.goal = goal
+        self._mapping = mapping
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, row):
+        if not 0 <= row < self.rows:
+            raise IndexError(row)
+        return _BitRow(self.bits, row * self.cols, self.cols)
+
+    def __iter__(self):
+        for row in range(self.rows):
+            yield self[row]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def is_wall(self, x, y):
+        index = x * self.cols + y
+        return (self.bits[index >> 3] >> (7 - (index & 7))) & 1 == 1
+
+    def unpack_rows(self, first, last):
+        first_bit, last_bit = first * self.cols, last * self.cols
+        packed = np.frombuffer(self.bits, dtype=np.uint8)[first_bit >> 3:(last_bit + 7) >> 3]
+        skip = first_bit & 7
+        cells = np.unpackbits(packed)[skip:skip + last_bit - first_bit]
+        return cells.reshape(last - first, self.cols)
+
+    def unpack(self):
+        return self.unpack_rows(0, self.rows)
+
+    def unpack_padded(self, fill=1):
+        # A byte per cell inside a ring of fill cells, as the solvers' FlatGrid wants it.
+        # Rows are unpacked a chunk at a time straight into place, so the padded grid is
+        # the only full copy ever held.
+        width = self.cols + 2
+        padded = bytearray([fill]) * ((self.rows + 2) * width)
+        grid = np.frombuffer(padded, dtype=np.uint8).reshape(self.rows + 2, width)
+        step = max(1, CELLS_PER_CHUNK // self.cols)
+        for first in range(0, self.rows, step):
+            last = min(self.rows, first + step)
+            grid[first + 1:last + 1, 1:-1] = self.unpack_rows(first, last)
+        return padded
+
+    def to_maze(self):
+        costs = bytearray(self.costs) if self.costs is not None else None
+        return Maze(self.rows, self.cols, bytearray(self.unpack().tobytes()), self.seed, costs)
+
+    def close(self):
+        if self._mapping is not None:
+            self.bits.release()
+            if self.costs is not None:
+                self.costs.release()
+            self._mapping.close()
+            self._mapping = None
+
+
+def _cell_rows(maze, first, last):
+    if isinstance(maze, Maze):
+        cells = np.frombuffer(maze.cells, dtype=np.uint8)
+        return cells[first * maze.cols:last * maze.cols]
+    if isinstance(maze, BitMaze):
+        return maze.unpack_rows(first, last).ravel()
+    return np.asarray(maze[first:last], dtype=np.uint8).ravel()
+
+
+def save_maze(path, maze, start=None, goal=None):
+    rows, cols = len(maze), len(maze[0])
+    start = start or getattr(maze, 'start', None) or (1, 1)
+    goal = goal or getattr(maze, 'goal', None) or (rows - 2, cols - 2)
+    seed = getattr(maze, 'seed', None)
+    costs = getattr(maze, 'costs', None)
+    flags = HAS_SEED if seed is not None else 0
+    if costs is not None:
+        flags |= HAS_COSTS
+
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, flags, rows, cols, seed or 0, *start, *goal))
+        chunks = (_cell_rows(maze, first, min(rows, first + ROWS_PER_CHUNK))
+                  for first in range(0, rows, ROWS_PER_CHUNK))
+        _write_bits(f, chunks)
+        if costs is not None:
+            f.write(costs)
+
+
+def _write_bits(f, chunks):
+    # Pack whole byte-aligned chunks of cells, carrying leftover bits forward,
+    # so huge mazes are written without unpacking them all at once
+    carry = np.zeros(0, dtype=np.uint8)
+    for chunk in chunks:
+        cells = np.concatenate((carry, chunk != 0)).astype(np.uint8)
+        usable = len(cells) - len(cells) % 8
+        f.write(np.packbits(cells[:usable]).tobytes())
+        carry = cells[usable:]
+    if len(carry):
+        f.write(np.packbits(carry).tobytes())
+
+
+def _row_chunks(row_iter, rows, cols):
+    # Bounded by cells rather than rows, so very wide mazes stream in small pieces too
+    per_chunk = max(1, min(ROWS_PER_CHUNK, CELLS_PER_CHUNK // cols))
+    row_iter = iter(row_iter)
+    for first in range(0, rows, per_chunk):
+        count = min(per_chunk, rows - first)
+        chunk = b''.join(islice(row_iter, count))
+        if len(chunk) != count * cols:
+            raise ValueError(f"expected {rows} rows of {cols} cells")
+        yield np.frombuffer(chunk, dtype=np.uint8)
+
+
+def save_maze_rows(path, rows, cols, row_iter, seed=None, start=None, goal=None):
+    # Writes a maze given as an iterable of rows (bytes, 1 = wall) without ever holding
+    # more than a chunk of it, e.g. straight from eller_rows()
+    start = start or (1, 1)
+    goal = goal or (rows - 2, cols - 2)
+    flags = HAS_SEED if seed is not None else 0
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, flags, rows, cols, seed or 0, *start, *goal))
+        _write_bits(f, _row_chunks(row_iter, rows, cols))
+
+
+def _read_header(data):
+    if len(data) < HEADER.size:
+        raise MazeFileError("file too short for a maze header")
+    magic, version, flags, rows, cols, seed, sx, sy, gx, gy = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise MazeFileError("not a maze file")
+    if version != VERSION:
+        raise MazeFileError(f"unsupported maze file version {version}")
+    if rows < 3 or cols < 3:
+        raise MazeFileError(f"maze must be at least 3x3, not {rows}x{cols}")
+    for name, (x, y) in (("start", (sx, sy)), ("goal", (gx, gy))):
+        if not (x < rows and y < cols):
+            raise MazeFileError(f"{name} ({x}, {y}) lies outside the {rows}x{cols} maze")
+    expected = HEADER.size + (rows * cols + 7) // 8
+    if flags & HAS_COSTS:
+        expected += rows * cols
+    if len(data) < expected:
+        raise MazeFileError("maze file is truncated")
+    seed = seed if flags & HAS_SEED else None
+    return rows, cols, flags, seed, (sx, sy), (gx, gy)
+
+
+def load_maze(path):
+    # Maps the file instead of reading it. Solvers still unpack the bits once into a
+    # padded byte-per-cell grid, but a chunk at a time, so that grid is the only full copy.
+    with open(path, 'rb') as f:
+        try:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # mmap refuses empty files
+            raise MazeFileError("file too short for a maze header") from None
+    try:
+        rows, cols, flags, seed, start, goal = _read_header(mapping)
+    except MazeFileError:
+        mapping.close()
+        raise
+    bits_end = HEADER.size + (rows * cols + 7) // 8
+    bits = memoryview(mapping)[HEADER.size:bits_end]
+    costs = memoryview(mapping)[bits_end:bits_end + rows * cols] if flags & HAS_COSTS else None
+    return BitMaze(rows, cols, bits, seed, start, goal, mapping, costs)
+
+
+def read_maze(path):
+    # Unpacked, editable copy for callers that need a byte-per-cell Maze
+    with load_maze(path) as packed:
+        maze = packed.to_maze()
+        return maze, packed.start, packed.goal
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a seeded maze straight into a maze file.")
+    parser.add_argument('path')
+    parser.add_argument('--rows', type=odd_size, required=True)
+    parser.add_argument('--cols', type=odd_size, default=None, help="defaults to the row count")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--generator', choices=sorted(GENERATORS), default='eller',
+                        help="eller streams row by row in O(cols) memory; the others build "
+                             "the whole maze first")
+    args = parser.parse_args(argv)
+
+    cols = args.cols or args.rows
+    seed = args.seed if args.seed is not None else random.randrange(2**32)
+    if args.generator == 'eller':
+        save_maze_rows(args.path, args.rows, cols, eller_rows(args.rows, seed, cols), seed)
+    else:
+        _, generate = GENERATORS[args.generator]
+        save_maze(args.path, generate(args.rows, seed, cols))
+    print(f"Wrote {args.rows}x{cols} {args.generator} maze (seed {seed}) to {args.path}",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+from array import array
+import random
+
+WALL = 1
+PASSAGE = 0
+
+# Transient cell codes used while carving: the direction we entered a cell
+# from (2-5) or the root marker, so backtracking needs no separate stack.
+_ENTERED = 2
+_ROOT = 6
+_BORDER = 7
+
+MAX_TERRAIN_COST = 9
+
+
+class Maze:
+    # Row-major grid of cells backed by a flat byte buffer (1 = wall, 0 = passage).
+    # Rows are exposed as memoryview slices so maze[x][y] works like the list layout.
+    # costs is an optional buffer of the same shape holding the cost (1-255) of
+    # stepping onto each cell; without it every move costs 1.
+    def __init__(self, rows, cols, cells=None, seed=None, costs=None):
+        self.rows = rows
+        self.cols = cols
+        self.cells = cells if cells is not None else bytearray([WALL]) * (rows * cols)
+        self.seed = seed
+        self.costs = costs
+        self._view = memoryview(self.cells)
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, row):
+        if not 0 <= row < self.rows:
+            raise IndexError(row)
+        start = row * self.cols
+        return self._view[start:start + self.cols]
+
+    def __iter__(self):
+        for row in range(self.rows):
+            yield self[row]
+
+    def is_wall(self, x, y):
+        return self.cells[x * self.cols + y] != PASSAGE
+
+    def cost(self, x, y):
+        return self.costs[x * self.cols + y] if self.costs is not None else 1
+
+    def to_lists(self):
+        return [list(row) for row in self]
+
+    @classmethod
+    def from_lists(cls, grid, seed=None):
+        rows, cols = len(grid), len(grid[0])
+        cells = bytearray(cell for row in grid for cell in row)
+        return cls(rows, cols, cells, seed)
+
+
+def _fill_border(cells, rows, cols, value):
+    total = rows * cols
+    cells[:cols] = bytes([value]) * cols
+    cells[total - cols:] = bytes([value]) * cols
+    cells[::cols] = bytes([value]) * rows
+    cells[cols - 1::cols] = bytes([value]) * rows
+
+
+def _check_size(size, cols):
+    rows = size
+    cols = size if cols is None else cols
+    if rows < 3 or cols < 3:
+        raise ValueError("maze must be at least 3x3")
+    # Cells sit on odd coordinates; an even side would leave the goal cell at
+    # (rows - 2, cols - 2) walled off from the rest of the maze
+    if rows % 2 == 0 or cols % 2 == 0:
+        raise ValueError(f"maze sides must be odd, not {rows}x{cols}")
+    return rows, cols
+
+
+def odd_size(text):
+    # argparse type for a maze side; the ValueError becomes a usage error
+    size = int(text)
+    _check_size(size, None)
+    return size
+
+
+def _find(parent, node):
+    # Union-find root with path halving
+    while parent[node] != node:
+        parent[node] = parent[parent[node]]
+        node = parent[node]
+    return node
+
+
+def generate_maze(size, seed=None, cols=None):
+    # Recursive-backtracker perfect maze, carved iteratively on the flat buffer.
+    # Memory is one byte per cell: the backtracking path is threaded through the
+    # cells themselves instead of being kept on an explicit stack.
+    rows, cols = _check_size(size, cols)
+    if seed is None:
+        seed = random.randrange(2**32)
+    rng = random.Random(seed)
+    randbelow = rng.randrange
+
+    maze = Maze(rows, cols, seed=seed)
+    cells = maze.cells
+    total = rows * cols
+
+    # Fence the border so out-of-range neighbours never look carvable
+    _fill_border(cells, rows, cols, _BORDER)
+
+    offsets = (2, -2, 2 * cols, -2 * cols)
+    down = 2 * cols
+    current = cols + 1
+    cells[current] = _ROOT
+
+    while True:
+        choices = []
+        if cells[current + 2] == WALL:
+            choices.append(0)
+        if cells[current - 2] == WALL:
+            choices.append(1)
+        if current + down < total and cells[current + down] == WALL:
+            choices.append(2)
+        if cells[current - down] == WALL:
+            choices.append(3)
+
+        if choices:
+            k = choices[randbelow(len(choices))] if len(choices) > 1 else choices[0]
+            step = offsets[k]
+            cells[current + step // 2] = PASSAGE
+            current += step
+            cells[current] = _ENTERED + k
+        else:
+            code = cells[current]
+            cells[current] = PASSAGE
+            if code == _ROOT:
+                break
+            current -= offsets[code - _ENTERED]
+
+    # Every carved cell was reset to PASSAGE on the way back out; only the fence remains
+    _fill_border(cells, rows, cols, WALL)
+    cells[(rows - 2) * cols + cols - 2] = PASSAGE
+    return maze
+
+
+def eller_rows(size, seed=None, cols=None):
+    # Eller's algorithm: a perfect maze built one row at a time. Only the set each cell
+    # of the current row belongs to is kept, so memory is O(cols) however many rows
+    # are produced. Yields every row of the grid as bytes (1 = wall, 0 = passage),
+    # with cells on odd coordinates like generate_maze.
+    rows, cols = _check_size(size, cols)
+    if seed is None:
+        seed = random.randrange(2**32)
+    rng = random.Random(seed)
+    getrandbits, randbelow = rng.getrandbits, rng.randrange
+    width, height = (cols - 1) // 2, (rows - 1) // 2
+    goal_x, goal_y = rows - 2, cols - 2
+    wall_row = bytes([WALL]) * cols
+    # A set is labelled by its root column in the row above; cells that start a new
+    # set are labelled width + column, so the two kinds never collide
+    labels = list(range(width))
+    parent = list(range(width))
+
+    yield wall_row
+    for i in range(height):
+        x = 2 * i + 1
+        last = i == height - 1
+        roots = {}
+        for col, label in enumerate(labels):
+            parent[col] = roots.setdefault(label, col)
+
+        row = bytearray(wall_row)
+        row[1:2 * width:2] = bytes(width)
+        for col in range(width - 1):
+            left, right = _find(parent, col), _find(parent, col + 1)
+            # The last row joins everything still apart, which makes the maze connected
+            if left != right and (last or getrandbits(1)):
+                parent[right] = left
+                row[2 * col + 2] = PASSAGE
+        if x == goal_x:
+            row[goal_y] = PASSAGE
+        yield bytes(row)
+        if last:
+            break
+
+        # Every set carries on downwards through at least one of its cells
+        members = {}
+        for col in range(width):
+            members.setdefault(_find(parent, col), []).append(col)
+            labels[col] = width + col
+        below = bytearray(wall_row)
+        for root, group in members.items():
+            forced = group[randbelow(len(group))] if len(group) > 1 else group[0]
+            for col in group:
+                if col == forced or getrandbits(1):
+                    labels[col] = root
+                    below[2 * col + 1] = PASSAGE
+        if x + 1 == goal_x:
+            below[goal_y] = PASSAGE
+        yield bytes(below)
+
+    # The bottom border, plus a spare wall row when the height is even
+    for x in range(2 * height, rows):
+        if x == goal_x:
+            row = bytearray(wall_row)
+            row[goal_y] = PASSAGE
+            yield bytes(row)
+        else:
+            yield wall_row
+
+
+def generate_eller(size, seed=None, cols=None):
+    rows, cols = _check_size(size, cols)
+    if seed is None:
+        seed = random.randrange(2**32)
+    cells = bytearray().join(eller_rows(rows, seed, cols))
+    return Maze(rows, cols, cells, seed)
+
+
+def generate_kruskal(size, seed=None, cols=None):
+    # Randomized Kruskal: walls between cells are knocked down in random order whenever
+    # they join two separate trees. The result has many short dead ends rather than
+    # the backtracker's long winding corridors.
+    rows, cols = _check_size(size, cols)
+    if seed is None:
+        seed = random.randrange(2**32)
+    rng = random.Random(seed)
+    width, height = (cols - 1) // 2, (rows - 1) // 2
+    count = width * height
+
+    maze = Maze(rows, cols, seed=seed)
+    cells = maze.cells
+    for x in range(1, 2 * height, 2):
+        cells[x * cols + 1:x * cols + 2 * width:2] = bytes(width)
+
+    # Wall 2 * cell is to the cell's right and 2 * cell + 1 below it
+    walls = array('i', range(2 * count))
+    rng.shuffle(walls)
+    parent = array('i', range(count))
+    joined = 0
+    for wall in walls:
+        cell, down = wall >> 1, wall & 1
+        cx, cy = divmod(cell, width)
+        if down:
+            if cx == height - 1:
+                continue
+            other = cell + width
+        else:
+            if cy == width - 1:
+                continue
+            other = cell + 1
+        root, other_root = _find(parent, cell), _find(parent, other)
+        if root == other_root:
+            continue
+        parent[other_root] = root
+        x, y = 2 * cx + 1, 2 * cy + 1
+        cells[(x + down) * cols + y + 1 - down] = PASSAGE
+        joined += 1
+        if joined == count - 1:
+            break
+
+    cells[(rows - 2) * cols + cols - 2] = PASSAGE
+    return maze
+
+
+def add_terrain(maze, seed=None, max_cost=MAX_TERRAIN_COST):
+    # Scatter round patches of slow terrain over the maze; later patches cover earlier
+    # ones. Walls get costs too, but they are never entered so it does not matter.
+    rows, cols = maze.rows, maze.cols
+    rng = random.Random(seed if seed is not None else maze.seed)
+    costs = bytearray([1]) * (rows * cols)
+    radius_limit = max(2, min(rows, cols) // 10)
+    # Enough patches that roughly half the maze ends up weighted, whatever its size
+    for _ in range(max(3, 2 * rows * cols // (3 * radius_limit * radius_limit))):
+        cx, cy = rng.randrange(rows), rng.randrange(cols)
+        radius = rng.randint(1, radius_limit)
+        fill = bytes([rng.randint(2, max_cost)])
+        for x in range(max(0, cx - radius), min(rows, cx + radius + 1)):
+            reach = int((radius * radius - (x - cx) ** 2) ** 0.5)
+            first, last = x * cols + max(0, cy - reach), x * cols + min(cols, cy + reach + 1)
+            costs[first:last] = fill * (last - first)
+    maze.costs = costs
+    return maze
+
+
+# Generator id -> (display name, generate function); all take (size, seed=None, cols=None)
+GENERATORS = {
+    'backtracker': ("Recursive Backtracker", generate_maze),
+    'eller': ("Eller", generate_eller),
+    'kruskal': ("Kruskal", generate_kruskal),
+}
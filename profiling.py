@@ -0,0 +1,155 @@
+from collections import deque
+import functools
+import json
+import statistics
+import sys
+import time
+
+DEFAULT_HISTORY = 240
+MAX_TRACE_EVENTS = 500000
+
+
+class Profiler:
+    # Per-frame timings for the hot paths. Hooks are installed by wrapping methods only
+    # while the profiler is enabled, so a disabled profiler costs nothing in them.
+    # While recording, spans are also kept as Chrome trace events (chrome://tracing).
+    def __init__(self, history=DEFAULT_HISTORY):
+        self.enabled = False
+        self.recording = False
+        self.hooks = []
+        self.installed = []
+        self.frame_times = deque(maxlen=history)
+        self.stage_history = {}
+        self.counter_history = {}
+        self.stages = {}
+        self.counters = {}
+        self.events = []
+        self.origin = time.perf_counter()
+        self.frame_start = None
+        self.frame_blocks = 0
+
+    def hook(self, owner, attr, name=None, trace=True):
+        # Register a method to time as a stage. Very hot methods should pass trace=False
+        # so they are only summed per frame rather than emitted as one event per call.
+        self.hooks.append((owner, attr, name or attr, trace))
+
+    def enable(self):
+        if self.enabled:
+            return
+        for owner, attr, name, trace in self.hooks:
+            original = owner.__dict__[attr]
+            setattr(owner, attr, self.timed(original, name, trace))
+            self.installed.append((owner, attr, original))
+        self.enabled = True
+
+    def disable(self):
+        if not self.enabled:
+            return
+        self.stop_recording()
+        for owner, attr, original in reversed(self.installed):
+            setattr(owner, attr, original)
+        self.installed = []
+        self.enabled = False
+        self.frame_start = None
+
+    def toggle(self):
+        if self.enabled:
+            self.disable()
+        else:
+            self.enable()
+
+    def timed(self, func, name, trace=True):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            begin = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.add(name, begin, time.perf_counter(), trace)
+        return wrapper
+
+    def add(self, name, begin, end, trace=True):
+        total, calls = self.stages.get(name, (0.0, 0))
+        self.stages[name] = (total + end - begin, calls + 1)
+        if trace and self.recording:
+            self.trace_event(name, begin, end)
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self.frame_start = time.perf_counter()
+        self.frame_blocks = sys.getallocatedblocks()
+        self.stages = {}
+        self.counters = {}
+
+    def end_frame(self):
+        if self.frame_start is None:
+            return
+        end = time.perf_counter()
+        self.frame_times.append(end - self.frame_start)
+        # Net change in live allocations over the frame; tracemalloc is far too slow here
+        self.count('allocated_blocks', sys.getallocatedblocks() - self.frame_blocks)
+        for name in self.stage_history.keys() | self.stages.keys():
+            history = self.stage_history.setdefault(name, deque(maxlen=self.frame_times.maxlen))
+            history.append(self.stages.get(name, (0.0, 0))[0])
+        for name in self.counter_history.keys() | self.counters.keys():
+            history = self.counter_history.setdefault(name, deque(maxlen=self.frame_times.maxlen))
+            history.append(self.counters.get(name, 0))
+        if self.recording:
+            self.trace_event('frame', self.frame_start, end)
+            self.trace_counters(end)
+        self.frame_start = None
+
+    def start_recording(self):
+        self.enable()
+        self.events = []
+        self.recording = True
+
+    def stop_recording(self):
+        self.recording = False
+
+    def trace_event(self, name, begin, end):
+        if len(self.events) >= MAX_TRACE_EVENTS:
+            self.recording = False
+            return
+        self.events.append({
+            'name': name, 'ph': 'X', 'pid': 1, 'tid': 1,
+            'ts': round((begin - self.origin) * 1e6, 3),
+            'dur': round((end - begin) * 1e6, 3),
+        })
+
+    def trace_counters(self, when):
+        if self.counters:
+            self.events.append({
+                'name': 'counters', 'ph': 'C', 'pid': 1, 'tid': 1,
+                'ts': round((when - self.origin) * 1e6, 3),
+                'args': dict(self.counters),
+            })
+
+    def export_trace(self, path):
+        with open(path, 'w') as output:
+            json.dump({'traceEvents': self.events, 'displayTimeUnit': 'ms'}, output)
+        return len(self.events)
+
+    def summary(self):
+        # Frame rate and percentiles over the recent history, plus the mean per-frame
+        # milliseconds of every stage and the mean of every counter
+        if not self.frame_times:
+            return None
+        ordered = sorted(self.frame_times)
+        mean = statistics.fmean(ordered)
+        return {
+            'fps': 1 / mean if mean else 0.0,
+            'p50_ms': ordered[len(ordered) // 2] * 1000,
+            'p99_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000,
+            'stages_ms': {name: statistics.fmean(history) * 1000
+                          for name, history in sorted(self.stage_history.items())},
+            'counters': {name: statistics.fmean(history)
+                         for name, history in sorted(self.counter_history.items())},
+        }
+
+
+profiler = Profiler()
@@ -0,0 +1,280 @@
+import argparse
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from mazegen import Maze, generate_maze
+from solvers import SOLVERS
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_TIMEOUT = 30.0
+MAX_LINE_BYTES = 64 * 1024 * 1024
+# Largest side a generated maze may have; bigger requests are refused, not attempted
+MAX_SIZE = 5001
+
+# Mazes travel as one string of '0'/'1' per row
+_TO_TEXT = bytes.maketrans(b'\x00\x01', b'01')
+_FROM_TEXT = bytes.maketrans(b'01', b'\x00\x01')
+
+
+class RequestError(ValueError):
+    pass
+
+
+def _internal_error(error):
+    return f"internal error: {type(error).__name__}: {error}"
+
+
+def maze_rows(maze):
+    text = bytes(maze.cells).translate(_TO_TEXT).decode()
+    return [text[i:i + maze.cols] for i in range(0, len(text), maze.cols)]
+
+
+def parse_rows(rows):
+    if not rows or not isinstance(rows, list) or not all(isinstance(row, str) for row in rows):
+        raise RequestError("maze rows must be a non-empty list of strings")
+    cols = len(rows[0])
+    if any(len(row) != cols for row in rows):
+        raise RequestError("maze rows must all have the same length")
+    text = ''.join(rows).encode()
+    if text.strip(b'01'):
+        raise RequestError("maze rows may only contain '0' and '1'")
+    return len(rows), cols, text.translate(_FROM_TEXT)
+
+
+def generate_job(size, seed, cols):
+    # Runs in a worker; the maze crosses back as raw cell bytes
+    maze = generate_maze(size, seed, cols)
+    return maze.rows, maze.cols, bytes(maze.cells), maze.seed
+
+
+def solve_job(rows, cols, cells, method, start, goal, include_path):
+    maze = Maze(rows, cols, bytearray(cells))
+    _, solve_func = SOLVERS[method]
+    begin = time.perf_counter()
+    path, nodes_visited = solve_func(maze, start, goal)
+    result = {
+        'path_length': len(path),
+        'nodes_visited': nodes_visited,
+        'time_ms': round((time.perf_counter() - begin) * 1000, 4),
+    }
+    if include_path:
+        result['path'] = path
+    return result
+
+
+def _cell(request, name, default, rows, cols, cells):
+    value = request.get(name, default)
+    if (not isinstance(value, (list, tuple)) or len(value) != 2
+            or not all(isinstance(v, int) for v in value)):
+        raise RequestError(f"{name} must be a pair of integers")
+    x, y = value
+    if not (0 <= x < rows and 0 <= y < cols) or cells[x * cols + y]:
+        raise RequestError(f"{name} must be an open cell inside the maze")
+    return x, y
+
+
+def parse_request(line):
+    request = json.loads(line)
+    if not isinstance(request, dict):
+        raise RequestError("request must be a JSON object")
+    return request
+
+
+class SolveServer:
+    # Serves generate and solve requests as JSON lines. CPU-bound work runs in a process
+    # pool. At most max_pending requests are in flight across all connections: each takes
+    # a slot before its task is created, and a connection is not read further while it
+    # waits for one, so a client that pipelines requests stalls on its own socket.
+    # Pings are answered straight away without a slot.
+    def __init__(self, workers=None, max_pending=None, timeout=DEFAULT_TIMEOUT):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.workers * 2
+        self.timeout = timeout
+        self.executor = None
+        self.slots = None
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None):
+        # Workers must not be forked from this process: the pool starts them lazily, by
+        # when client sockets are open, and a forked worker holding a copy of one keeps
+        # the connection from ever reaching EOF after we close it
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+        self.slots = asyncio.Semaphore(self.max_pending)
+        if unix_path:
+            return await asyncio.start_unix_server(self.handle_connection, unix_path,
+                                                   limit=MAX_LINE_BYTES)
+        return await asyncio.start_server(self.handle_connection, host, port, limit=MAX_LINE_BYTES)
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    async def run_job(self, timeout, func, *args):
+        # A timed-out job is abandoned rather than killed: the worker finishes it and
+        # the result is dropped, but the request answers and frees its slot immediately
+        future = asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+        return await asyncio.wait_for(future, timeout)
+
+    async def handle_connection(self, reader, writer):
+        tasks = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, asyncio.LimitOverrunError):
+                    await self.send(writer, {'id': None, 'error': "request line too long"})
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                try:
+                    request = parse_request(line)
+                except ValueError as error:
+                    await self.send(writer, {'id': None, 'error': str(error)})
+                    continue
+                if request.get('op') == 'ping':
+                    await self.send(writer, {'id': request.get('id'), 'ok': True})
+                    continue
+                # Wait for capacity before reading on, so a client that floods us stalls
+                # on its socket instead of growing our queue
+                await self.slots.acquire()
+                if writer.is_closing():
+                    # A reply failed while we waited: the client is gone
+                    self.slots.release()
+                    break
+                task = asyncio.create_task(self.handle_request(request, writer))
+                tasks.add(task)
+                task.add_done_callback(self.request_done(tasks))
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        except ConnectionError:
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    def request_done(self, tasks):
+        def done(task):
+            tasks.discard(task)
+            self.slots.release()
+        return done
+
+    async def send(self, writer, message):
+        writer.write(json.dumps(message).encode() + b"\n")
+        await writer.drain()
+
+    async def handle_request(self, request, writer):
+        # Every request gets an answer: a failure, even one raised in a worker, becomes
+        # an error line rather than leaving the client waiting
+        request_id = request.get('id')
+        try:
+            op = request.get('op')
+            timeout = min(float(request.get('timeout', self.timeout)), self.timeout)
+            if op == 'generate':
+                await self.generate(request, request_id, timeout, writer)
+            elif op == 'solve':
+                await self.solve(request, request_id, timeout, writer)
+            else:
+                raise RequestError(f"unknown op {op!r}")
+        except ConnectionError:
+            writer.close()
+        except asyncio.TimeoutError:
+            await self.send(writer, {'id': request_id, 'error': "timed out"})
+        except (RequestError, ValueError, TypeError) as error:
+            await self.send(writer, {'id': request_id, 'error': str(error)})
+        except Exception as error:
+            await self.send(writer, {'id': request_id, 'error': _internal_error(error)})
+
+    async def load_maze(self, request, timeout):
+        spec = request.get('maze')
+        if not isinstance(spec, dict):
+            raise RequestError("maze must be an object with rows or size")
+        if 'rows' in spec:
+            rows, cols, cells = parse_rows(spec['rows'])
+            return rows, cols, cells, None
+        return await self.run_job(timeout, generate_job, *self.generate_args(spec))
+
+    def generate_args(self, spec):
+        size, seed, cols = spec.get('size'), spec.get('seed'), spec.get('cols')
+        for value in (size, size if cols is None else cols):
+            if not isinstance(value, int) or not 5 <= value <= MAX_SIZE or value % 2 == 0:
+                raise RequestError(f"size and cols must be odd integers from 5 to {MAX_SIZE}")
+        if seed is not None and not isinstance(seed, int):
+            raise RequestError("seed must be an integer")
+        return size, seed, cols
+
+    async def generate(self, request, request_id, timeout, writer):
+        rows, cols, cells, seed = await self.run_job(timeout, generate_job,
+                                                     *self.generate_args(request))
+        maze = Maze(rows, cols, bytearray(cells), seed)
+        await self.send(writer, {'id': request_id, 'rows': rows, 'cols': cols, 'seed': seed,
+                                 'maze': maze_rows(maze)})
+
+    async def solve(self, request, request_id, timeout, writer):
+        # Each solver's result is streamed as soon as it finishes, then a final done line
+        deadline = time.monotonic() + timeout
+        methods = request.get('solvers') or [request.get('solver', 'bfs')]
+        unknown = [method for method in methods if method not in SOLVERS]
+        if unknown:
+            raise RequestError(f"unknown solvers: {', '.join(map(str, unknown))}")
+        rows, cols, cells, seed = await self.load_maze(request, timeout)
+        start = _cell(request, 'start', (1, 1), rows, cols, cells)
+        goal = _cell(request, 'goal', (rows - 2, cols - 2), rows, cols, cells)
+        include_path = bool(request.get('include_path'))
+
+        async def solve_one(method):
+            remaining = max(0.0, deadline - time.monotonic())
+            try:
+                result = await self.run_job(remaining, solve_job, rows, cols, cells, method,
+                                            start, goal, include_path)
+            except asyncio.TimeoutError:
+                result = {'error': "timed out"}
+            except Exception as error:
+                result = {'error': _internal_error(error)}
+            await self.send(writer, {'id': request_id, 'solver': method, 'seed': seed, **result})
+
+        await asyncio.gather(*(solve_one(method) for method in methods))
+        await self.send(writer, {'id': request_id, 'done': True})
+
+
+async def serve(args):
+    server = SolveServer(args.workers, args.max_pending, args.timeout)
+    listener = await server.start(args.host, args.port, args.unix)
+    where = args.unix or f"{args.host}:{args.port}"
+    print(f"Serving on {where}", file=sys.stderr)
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve maze generation and solving as JSON lines.")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--unix', help="listen on this Unix socket path instead of TCP")
+    parser.add_argument('--workers', type=int, default=None, help="defaults to the CPU count")
+    parser.add_argument('--max-pending', type=int, default=None,
+                        help="jobs queued or running at once; defaults to twice the workers")
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help="upper bound in seconds for any request")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
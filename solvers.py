@@ -0,0 +1,538 @@
+from array import array
+from collections import deque
+import heapq
+import math
+
+DIRECTIONS = [(0, 1), (1, 0), (0, -1), (-1, 0)]
+
+
+def heuristic_manhattan(node, goal):
+    return abs(node[0] - goal[0]) + abs(node[1] - goal[1])
+
+
+def heuristic_euclidean(node, goal):
+    return math.sqrt((node[0] - goal[0])**2 + (node[1] - goal[1])**2)
+
+
+def cell_costs(maze):
+    # Flat row-major buffer of per-cell entry costs, or None when every move costs 1.
+    # Only Dijkstra and A* take costs into account; the other solvers count moves.
+    return getattr(maze, 'costs', None)
+
+
+def path_cost(maze, path):
+    costs = cell_costs(maze)
+    if costs is None:
+        return max(0, len(path) - 1)
+    cols = len(maze[0])
+    return sum(costs[x * cols + y] for x, y in path[1:])
+
+
+# Largest g or distance a search stores; array('i') holds signed 32-bit values
+UNREACHED = 2**31 - 1
+
+
+def _pad(flat, rows, cols, fill):
+    width = cols + 2
+    padded = bytearray([fill]) * ((rows + 2) * width)
+    view = memoryview(flat)
+    for x in range(rows):
+        begin = (x + 1) * width + 1
+        padded[begin:begin + cols] = view[x * cols:(x + 1) * cols]
+    return padded
+
+
+class FlatGrid:
+    # The maze copied into one row-major bytearray with a ring of walls around it, so a
+    # neighbour is index + offset and never needs a bounds check. Searches keep their
+    # state in parallel flat buffers (a byte per cell for visited, an int for the
+    # parent) rather than sets and dicts keyed by coordinate tuples.
+    def __init__(self, maze):
+        rows, cols = len(maze), len(maze[0])
+        costs = cell_costs(maze)
+        self.rows, self.cols = rows, cols
+        self.width = cols + 2
+        self.size = (rows + 2) * self.width
+        cells = getattr(maze, 'cells', None)
+        if cells is None and hasattr(maze, 'unpack_padded'):
+            # Packed mazes unpack straight into the padded grid
+            self.cells = maze.unpack_padded(1)
+        else:
+            if cells is None:
+                cells = b''.join(bytes(row) for row in maze)
+            self.cells = _pad(cells, rows, cols, 1)
+        self.costs = _pad(costs, rows, cols, 0) if costs is not None else None
+        # Same order as DIRECTIONS, so ties break the way the tuple solvers did
+        self.offsets = (1, self.width, -1, -self.width)
+        # index - 2 * (index // width) - shift is the unpadded x * cols + y used in traces
+        self.shift = cols + 1
+
+    def index(self, cell):
+        return (cell[0] + 1) * self.width + cell[1] + 1
+
+    def cell(self, index):
+        x, y = divmod(index, self.width)
+        return x - 1, y - 1
+
+    def path(self, parents, index):
+        path = []
+        while index >= 0:
+            path.append(self.cell(index))
+            index = parents[index]
+        return path[::-1]
+
+
+def run_steps(steps, trace=None):
+    # Drive a step generator to completion. Each step yields the flat index of the
+    # cell just expanded; the generator returns (path, nodes_visited).
+    step = steps.__next__
+    try:
+        if trace is None:
+            while True:
+                step()
+        else:
+            append = trace.append
+            while True:
+                append(step())
+    except StopIteration as done:
+        return done.value
+
+
+def bfs_steps(maze, start, goal):
+    grid = FlatGrid(maze)
+    offsets, width, shift = grid.offsets, grid.width, grid.shift
+    source, target = grid.index(start), grid.index(goal)
+    # Walls start out visited, so one lookup rejects both
+    visited = bytearray(grid.cells)
+    parents = array('i', [-1]) * grid.size
+    queue = deque([source])
+    nodes_visited = 0
+
+    while queue:
+        current = queue.popleft()
+        if visited[current]:
+            continue
+        visited[current] = 1
+        nodes_visited += 1
+        yield current - 2 * (current // width) - shift
+
+        if current == target:
+            return grid.path(parents, current), nodes_visited
+
+        for offset in offsets:
+            neighbor = current + offset
+            if not visited[neighbor]:
+                # Cells are marked when expanded, so the last cell to discover one
+                # becomes its parent; this keeps the original tie-break between paths
+                parents[neighbor] = current
+                queue.append(neighbor)
+    return [], nodes_visited
+
+
+def bfs_solve(maze, start, goal, trace=None):
+    return run_steps(bfs_steps(maze, start, goal), trace)
+
+
+def dfs_steps(maze, start, goal):
+    grid = FlatGrid(maze)
+    offsets, width, shift = grid.offsets, grid.width, grid.shift
+    source, target = grid.index(start), grid.index(goal)
+    visited = bytearray(grid.cells)
+    parents = array('i', [-1]) * grid.size
+    stack = [source]
+    nodes_visited = 0
+
+    while stack:
+        current = stack.pop()
+        if visited[current]:
+            continue
+        visited[current] = 1
+        nodes_visited += 1
+        yield current - 2 * (current // width) - shift
+
+        if current == target:
+            return grid.path(parents, current), nodes_visited
+
+        for offset in offsets:
+            neighbor = current + offset
+            if not visited[neighbor]:
+                stack.append(neighbor)
+                parents[neighbor] = current
+    return [], nodes_visited
+
+
+def dfs_solve(maze, start, goal, trace=None):
+    return run_steps(dfs_steps(maze, start, goal), trace)
+
+
+def astar_steps(maze, start, goal, heuristic_func=heuristic_manhattan):
+    grid = FlatGrid(maze)
+    offsets, width, shift, costs = grid.offsets, grid.width, grid.shift, grid.costs
+    source, target = grid.index(start), grid.index(goal)
+    # Both heuristics only depend on the offset between cells, so padded coordinates do
+    goal_cell = divmod(target, width)
+    # Scaling by the cheapest cell keeps the heuristic admissible on weighted terrain
+    scale = min(cell_costs(maze)) if costs else 1
+    visited = bytearray(grid.cells)
+    parents = array('i', [-1]) * grid.size
+    g_scores = array('i', [UNREACHED]) * grid.size
+    g_scores[source] = 0
+    p_queue = [(0, source)]
+    heappush, heappop = heapq.heappush, heapq.heappop
+    nodes_visited = 0
+
+    while p_queue:
+        _, current = heappop(p_queue)
+        if visited[current]:
+            continue
+        visited[current] = 1
+        nodes_visited += 1
+        yield current - 2 * (current // width) - shift
+
+        if current == target:
+            return grid.path(parents, current), nodes_visited
+
+        base = g_scores[current]
+        for offset in offsets:
+            neighbor = current + offset
+            if not visited[neighbor]:
+                g_score = base + (costs[neighbor] if costs else 1)
+                if g_score < g_scores[neighbor]:
+                    g_scores[neighbor] = g_score
+                    f_score = g_score + scale * heuristic_func(divmod(neighbor, width), goal_cell)
+                    heappush(p_queue, (f_score, neighbor))
+                    parents[neighbor] = current
+    return [], nodes_visited
+
+
+def astar_solve(maze, start, goal, heuristic_func=heuristic_manhattan, trace=None):
+    return run_steps(astar_steps(maze, start, goal, heuristic_func), trace)
+
+
+def astar_manhattan_steps(maze, start, goal):
+    return astar_steps(maze, start, goal, heuristic_manhattan)
+
+
+def astar_euclidean_steps(maze, start, goal):
+    return astar_steps(maze, start, goal, heuristic_euclidean)
+
+
+def astar_manhattan_solve(maze, start, goal, trace=None):
+    return astar_solve(maze, start, goal, heuristic_manhattan, trace)
+
+
+def astar_euclidean_solve(maze, start, goal, trace=None):
+    return astar_solve(maze, start, goal, heuristic_euclidean, trace)
+
+
+def dijkstra_steps(maze, start, goal):
+    # Dial's algorithm: with integer costs of at most C, every tentative distance lies
+    # within C of the one being settled, so C + 1 buckets used as a ring replace the heap
+    grid = FlatGrid(maze)
+    offsets, width, shift, costs = grid.offsets, grid.width, grid.shift, grid.costs
+    source, target = grid.index(start), grid.index(goal)
+    ring = (max(costs) if costs else 1) + 1
+    buckets = [[] for _ in range(ring)]
+    buckets[0].append(source)
+    pending = 1
+    distance = 0
+    distances = array('i', [UNREACHED]) * grid.size
+    distances[source] = 0
+    visited = bytearray(grid.cells)
+    parents = array('i', [-1]) * grid.size
+    nodes_visited = 0
+
+    while pending:
+        bucket = buckets[distance % ring]
+        if not bucket:
+            distance += 1
+            continue
+        current = bucket.pop()
+        pending -= 1
+        if visited[current]:
+            continue
+        visited[current] = 1
+        nodes_visited += 1
+        yield current - 2 * (current // width) - shift
+
+        if current == target:
+            return grid.path(parents, current), nodes_visited
+
+        for offset in offsets:
+            neighbor = current + offset
+            if not visited[neighbor]:
+                new_distance = distance + (costs[neighbor] if costs else 1)
+                if new_distance < distances[neighbor]:
+                    distances[neighbor] = new_distance
+                    parents[neighbor] = current
+                    buckets[new_distance % ring].append(neighbor)
+                    pending += 1
+    return [], nodes_visited
+
+
+def dijkstra_solve(maze, start, goal, trace=None):
+    return run_steps(dijkstra_steps(maze, start, goal), trace)
+
+
+def bidirectional_bfs_steps(maze, start, goal):
+    grid = FlatGrid(maze)
+    offsets, width, shift = grid.offsets, grid.width, grid.shift
+    source, target = grid.index(start), grid.index(goal)
+    if grid.cells[source] or grid.cells[target]:
+        return [], 0
+    if source == target:
+        return [tuple(start)], 1
+
+    # Grow whole BFS levels from both ends, always extending the smaller frontier.
+    # The first node reached by both searches lies on a shortest path.
+    parents = [array('i', [-1]) * grid.size, array('i', [-1]) * grid.size]
+    reached = [bytearray(grid.cells), bytearray(grid.cells)]
+    reached[0][source] = reached[1][target] = 1
+    frontiers = [[source], [target]]
+    nodes_visited = 0
+
+    while frontiers[0] and frontiers[1]:
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        own, other, own_parents = reached[side], reached[1 - side], parents[side]
+        next_frontier = []
+        meeting = -1
+
+        for current in frontiers[side]:
+            nodes_visited += 1
+            yield current - 2 * (current // width) - shift
+            for offset in offsets:
+                neighbor = current + offset
+                if not own[neighbor]:
+                    own[neighbor] = 1
+                    own_parents[neighbor] = current
+                    next_frontier.append(neighbor)
+                    if other[neighbor]:
+                        meeting = neighbor
+                        break
+            if meeting >= 0:
+                break
+
+        if meeting >= 0:
+            path = grid.path(parents[0], meeting)
+            path.extend(grid.path(parents[1], parents[1][meeting])[::-1])
+            return path, nodes_visited
+        frontiers[side] = next_frontier
+    return [], nodes_visited
+
+
+def bidirectional_bfs_solve(maze, start, goal, trace=None):
+    return run_steps(bidirectional_bfs_steps(maze, start, goal), trace)
+
+
+def _jump(cells, index, offset, side, target):
+    # Slide along a corridor until reaching the goal or a cell with a side opening.
+    # Cells in between have only one way forward, so expanding them is redundant.
+    while True:
+        index += offset
+        if cells[index]:
+            return -1
+        if index == target or not cells[index - side] or not cells[index + side]:
+            return index
+
+
+def _expand_jumps(jump_points):
+    path = jump_points[:1]
+    for (x, y), (nx, ny) in zip(jump_points, jump_points[1:]):
+        dx, dy = (nx > x) - (nx < x), (ny > y) - (ny < y)
+        while (x, y) != (nx, ny):
+            x, y = x + dx, y + dy
+            path.append((x, y))
+    return path
+
+
+def jps_steps(maze, start, goal):
+    # Jump Point Search adapted to 4-connected grids: A* over corridor endpoints
+    grid = FlatGrid(maze)
+    cells, width, shift = grid.cells, grid.width, grid.shift
+    source, target = grid.index(start), grid.index(goal)
+    goal_x, goal_y = divmod(target, width)
+    # Moving along a row the side openings are a row apart, and the other way round
+    moves = [(offset, width if abs(offset) == 1 else 1) for offset in grid.offsets]
+    visited = bytearray(grid.size)
+    parents = array('i', [-1]) * grid.size
+    g_scores = array('i', [UNREACHED]) * grid.size
+    g_scores[source] = 0
+    p_queue = [(heuristic_manhattan(start, goal), source)]
+    heappush, heappop = heapq.heappush, heapq.heappop
+    nodes_visited = 0
+
+    while p_queue:
+        _, current = heappop(p_queue)
+        if visited[current]:
+            continue
+        visited[current] = 1
+        nodes_visited += 1
+        yield current - 2 * (current // width) - shift
+
+        if current == target:
+            return _expand_jumps(grid.path(parents, current)), nodes_visited
+
+        base = g_scores[current]
+        for offset, side in moves:
+            jump_point = _jump(cells, current, offset, side, target)
+            if jump_point < 0 or visited[jump_point]:
+                continue
+            g_score = base + (jump_point - current) // offset
+            if g_score < g_scores[jump_point]:
+                g_scores[jump_point] = g_score
+                x, y = divmod(jump_point, width)
+                heappush(p_queue, (g_score + abs(x - goal_x) + abs(y - goal_y), jump_point))
+                parents[jump_point] = current
+    return [], nodes_visited
+
+
+def jps_solve(maze, start, goal, trace=None):
+    return run_steps(jps_steps(maze, start, goal), trace)
+
+
+class LPAStar:
+    # Lifelong Planning A*: g and rhs values survive between searches, so after a few
+    # cells change only the part of the search they affect is repaired. The planner
+    # reads the maze it was given; call update_cell() after changing a cell in it.
+    def __init__(self, maze, start, goal, heuristic_func=heuristic_manhattan):
+        self.maze = maze
+        self.rows, self.cols = len(maze), len(maze[0])
+        self.start, self.goal = tuple(start), tuple(goal)
+        self.heuristic_func = heuristic_func
+        size = self.rows * self.cols
+        self.g = [math.inf] * size
+        self.rhs = [math.inf] * size
+        self.start_index = self.start[0] * self.cols + self.start[1]
+        self.goal_index = self.goal[0] * self.cols + self.goal[1]
+        self.rhs[self.start_index] = 0
+        self.open_set = [(*self.key(self.start_index), self.start_index)]
+
+    def key(self, index):
+        best = min(self.g[index], self.rhs[index])
+        return best + self.heuristic_func(divmod(index, self.cols), self.goal), best
+
+    def neighbors(self, index):
+        maze, rows, cols = self.maze, self.rows, self.cols
+        x, y = divmod(index, cols)
+        result = []
+        for dx, dy in DIRECTIONS:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < rows and 0 <= ny < cols and maze[nx][ny] == 0:
+                result.append(nx * cols + ny)
+        return result
+
+    def update_vertex(self, index):
+        g, rhs = self.g, self.rhs
+        if index != self.start_index:
+            x, y = divmod(index, self.cols)
+            if self.maze[x][y]:
+                rhs[index] = math.inf
+            else:
+                rhs[index] = min([g[n] for n in self.neighbors(index)], default=math.inf) + 1
+        if g[index] != rhs[index]:
+            # Outdated heap entries are skipped when they surface
+            heapq.heappush(self.open_set, (*self.key(index), index))
+
+    def update_cell(self, x, y):
+        # The cell was opened or walled; its own rhs and its neighbours' depend on it
+        index = x * self.cols + y
+        self.update_vertex(index)
+        for dx, dy in DIRECTIONS:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < self.rows and 0 <= ny < self.cols:
+                self.update_vertex(nx * self.cols + ny)
+
+    def replan_steps(self):
+        g, rhs, open_set = self.g, self.rhs, self.open_set
+        key, neighbors, update_vertex = self.key, self.neighbors, self.update_vertex
+        heappop, heapreplace = heapq.heappop, heapq.heapreplace
+        goal = self.goal_index
+        nodes_visited = 0
+        while open_set:
+            k1, k2, index = open_set[0]
+            if g[index] == rhs[index]:
+                heappop(open_set)
+                continue
+            current = key(index)
+            if (k1, k2) != current:
+                if (k1, k2) > current:
+                    heappop(open_set)
+                else:
+                    heapreplace(open_set, (*current, index))
+                continue
+            if rhs[goal] == g[goal] and current >= key(goal):
+                break
+            heappop(open_set)
+            if g[index] > rhs[index]:
+                # Overconsistent: settle the cell; only neighbours it improves change
+                cost = g[index] = rhs[index]
+                cost += 1
+                for neighbor in neighbors(index):
+                    if cost < rhs[neighbor]:
+                        rhs[neighbor] = cost
+                        heapq.heappush(open_set, (*key(neighbor), neighbor))
+            else:
+                g[index] = math.inf
+                update_vertex(index)
+                for neighbor in neighbors(index):
+                    update_vertex(neighbor)
+            nodes_visited += 1
+            yield index
+        return self.path(), nodes_visited
+
+    def replan(self, trace=None):
+        return run_steps(self.replan_steps(), trace)
+
+    def path(self):
+        g, cols = self.g, self.cols
+        current = self.goal_index
+        if g[current] == math.inf:
+            return []
+        path = [self.goal]
+        while current != self.start_index:
+            current = min(self.neighbors(current), key=g.__getitem__)
+            path.append(divmod(current, cols))
+        return path[::-1]
+
+
+def lpastar_steps(maze, start, goal):
+    return LPAStar(maze, start, goal).replan_steps()
+
+
+def lpastar_solve(maze, start, goal, trace=None):
+    return run_steps(lpastar_steps(maze, start, goal), trace)
+
+
+# Solver id -> (display name, solve function); ids match the sidebar buttons
+SOLVERS = {
+    'bfs': ("BFS", bfs_solve),
+    'dfs': ("DFS", dfs_solve),
+    'astar_manhattan': ("A* Manhattan", astar_manhattan_solve),
+    'astar_euclidean': ("A* Euclidean", astar_euclidean_solve),
+    'dijkstra': ("Dijkstra", dijkstra_solve),
+    'bidirectional_bfs': ("Bidirectional BFS", bidirectional_bfs_solve),
+    'jps': ("Jump Point Search", jps_solve),
+    'lpastar': ("LPA*", lpastar_solve),
+}
+
+
+# Solver id -> resumable step generator, for callers that interleave the search with other work
+SOLVER_STEPS = {
+    'bfs': bfs_steps,
+    'dfs': dfs_steps,
+    'astar_manhattan': astar_manhattan_steps,
+    'astar_euclidean': astar_euclidean_steps,
+    'dijkstra': dijkstra_steps,
+    'bidirectional_bfs': bidirectional_bfs_steps,
+    'jps': jps_steps,
+    'lpastar': lpastar_steps,
+}
+
+
+def solve(method, maze, start, goal, trace=None):
+    _, solve_func = SOLVERS[method]
+    return solve_func(maze, start, goal, trace)
+
+
+def solve_steps(method, maze, start, goal):
+    return SOLVER_STEPS[method](maze, start, goal)
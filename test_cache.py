@@ -0,0 +1,35 @@
+from array import array
+
+from cache import SolutionCache, maze_key
+from mazegen import generate_maze
+from solvers import bfs_solve
+
+
+def test_bfs_is_not_answered_from_a_distance_field():
+    maze = generate_maze(41, 3)
+    # Open every other wall along a few rows so shortest paths tie
+    for x in (10, 20, 30):
+        maze.cells[x * 41 + 1:x * 41 + 40:2] = bytes(20)
+    key = maze_key(maze)
+    cache = SolutionCache()
+    cache.distance_field(maze, (1, 1), key)
+    assert cache.lookup('bfs', key, (1, 1), (39, 39)) is None
+
+    trace = array('i')
+    result = cache.solve('bfs', maze, (1, 1), (39, 39), key, trace)
+    expected_trace = array('i')
+    assert result == bfs_solve(maze, (1, 1), (39, 39), expected_trace)
+    assert trace == expected_trace
+    assert cache.stats()['hits'] == 0
+
+
+def test_hits_refresh_and_invalidate():
+    maze = generate_maze(21, 1)
+    key = maze_key(maze)
+    cache = SolutionCache()
+    first = cache.solve('bfs', maze, (1, 1), (19, 19), key)
+    assert cache.solve('bfs', maze, (1, 1), (19, 19), key) == first
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 1, 1)
+    cache.invalidate_maze(key)
+    assert cache.stats()['entries'] == 0
@@ -0,0 +1,81 @@
+import pytest
+
+from mazefile import (HEADER, MAGIC, VERSION, MazeFileError, load_maze, read_maze, save_maze,
+                      save_maze_rows)
+from mazegen import add_terrain, eller_rows, generate_eller, generate_maze
+
+
+def write_header(path, rows, cols, start=(1, 1), goal=(1, 1), body=b''):
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, rows, cols, 0, *start, *goal) + body)
+
+
+@pytest.mark.parametrize('rows, cols', [(21, 21), (23, 41), (37, 9)])
+def test_round_trip(tmp_path, rows, cols):
+    maze = generate_maze(rows, 5, cols)
+    path = tmp_path / 'maze.bin'
+    save_maze(path, maze, (1, 1), (rows - 2, cols - 2))
+
+    with load_maze(path) as packed:
+        assert (packed.rows, packed.cols, packed.seed) == (rows, cols, 5)
+        assert (packed.start, packed.goal) == ((1, 1), (rows - 2, cols - 2))
+        assert bytes(packed.unpack()) == bytes(maze.cells)
+        assert all(packed.is_wall(x, y) == maze.is_wall(x, y)
+                   for x in range(rows) for y in range(cols))
+
+    copy, start, goal = read_maze(path)
+    assert copy.cells == maze.cells
+    assert (start, goal) == ((1, 1), (rows - 2, cols - 2))
+
+
+@pytest.mark.parametrize('header, message', [
+    ((0, 21), "at least 3x3"),
+    ((21, 2), "at least 3x3"),
+    ((21, 21, (21, 1)), "start"),
+    ((21, 21, (1, 1), (1, 40)), "goal"),
+])
+def test_rejects_bad_header(tmp_path, header, message):
+    path = tmp_path / 'bad.bin'
+    write_header(path, *header, body=bytes(64))
+    with pytest.raises(MazeFileError, match=message):
+        load_maze(path)
+
+
+def test_rejects_empty_file(tmp_path):
+    path = tmp_path / 'empty.bin'
+    path.write_bytes(b'')
+    with pytest.raises(MazeFileError):
+        load_maze(path)
+
+
+def test_rejects_truncated_and_foreign_files(tmp_path):
+    path = tmp_path / 'short.bin'
+    write_header(path, 21, 21)
+    with pytest.raises(MazeFileError, match="truncated"):
+        load_maze(path)
+    path.write_bytes(b'PNG!' + bytes(HEADER.size))
+    with pytest.raises(MazeFileError, match="not a maze file"):
+        load_maze(path)
+
+
+def test_round_trip_keeps_terrain(tmp_path):
+    maze = add_terrain(generate_maze(31, 8, 45), 8)
+    path = tmp_path / 'terrain.bin'
+    save_maze(path, maze)
+    with load_maze(path) as packed:
+        assert bytes(packed.costs) == bytes(maze.costs)
+    copy, _, _ = read_maze(path)
+    assert copy.costs == maze.costs
+
+
+def test_streamed_rows_match_generated_maze(tmp_path):
+    path = tmp_path / 'eller.bin'
+    save_maze_rows(path, 31, 45, eller_rows(31, 2, 45), seed=2)
+    maze, start, goal = read_maze(path)
+    assert maze.cells == generate_eller(31, 2, 45).cells
+    assert (maze.seed, start, goal) == (2, (1, 1), (29, 43))
+
+
+def test_streamed_rows_must_fill_the_maze(tmp_path):
+    with pytest.raises(ValueError):
+        save_maze_rows(tmp_path / 'short.bin', 31, 45, eller_rows(29, 2, 45))
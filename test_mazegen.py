@@ -0,0 +1,34 @@
+import pytest
+
+from mazegen import GENERATORS, eller_rows, generate_maze, odd_size
+from solvers import bfs_solve
+
+
+@pytest.mark.parametrize('generator', sorted(GENERATORS))
+@pytest.mark.parametrize('rows, cols', [(5, 5), (21, 21), (7, 33), (33, 7)])
+def test_goal_is_reachable(generator, rows, cols):
+    _, generate = GENERATORS[generator]
+    maze = generate(rows, 3, cols)
+    path, _ = bfs_solve(maze, (1, 1), (rows - 2, cols - 2))
+    assert path
+
+
+@pytest.mark.parametrize('generator', sorted(GENERATORS))
+@pytest.mark.parametrize('rows, cols', [(20, 20), (22, None), (21, 22), (2, 3)])
+def test_rejects_even_or_tiny_sides(generator, rows, cols):
+    _, generate = GENERATORS[generator]
+    with pytest.raises(ValueError):
+        generate(rows, 1, cols)
+
+
+def test_streamed_rows_reject_even_sides():
+    with pytest.raises(ValueError):
+        next(eller_rows(21, 1, 22))
+
+
+def test_odd_size_argument():
+    assert odd_size('41') == 41
+    for text in ('40', '1', 'big'):
+        with pytest.raises(ValueError):
+            odd_size(text)
+    assert generate_maze(odd_size('9'), 1).rows == 9
@@ -0,0 +1,55 @@
+import asyncio
+import json
+
+from server import SolveServer
+
+
+async def exchange(server, lines):
+    listener = await server.start(port=0)
+    port = listener.sockets[0].getsockname()[1]
+    try:
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(b''.join(json.dumps(line).encode() + b"\n" for line in lines))
+        writer.write_eof()
+        # The server closes the connection once every request is answered
+        data = await asyncio.wait_for(reader.read(), 30)
+        writer.close()
+        return [json.loads(line) for line in data.splitlines()]
+    finally:
+        listener.close()
+        await listener.wait_closed()
+        server.close()
+
+
+def test_connection_reaches_eof_after_a_job():
+    replies = asyncio.run(exchange(SolveServer(workers=1), [
+        {'id': 1, 'op': 'generate', 'size': 21, 'seed': 1},
+    ]))
+    assert [reply['id'] for reply in replies] == [1]
+    assert replies[0]['rows'] == 21 and len(replies[0]['maze']) == 21
+
+
+def test_solve_streams_results_then_done():
+    replies = asyncio.run(exchange(SolveServer(workers=2), [
+        {'id': 'a', 'op': 'ping'},
+        {'id': 'b', 'op': 'solve', 'solvers': ['bfs', 'dijkstra'], 'maze': {'size': 21, 'seed': 2}},
+        {'id': 'c', 'op': 'nonsense'},
+    ]))
+    by_id = {}
+    for reply in replies:
+        by_id.setdefault(reply['id'], []).append(reply)
+    assert by_id['a'] == [{'id': 'a', 'ok': True}]
+    assert by_id['b'][-1] == {'id': 'b', 'done': True}
+    lengths = {reply['solver']: reply['path_length'] for reply in by_id['b'][:-1]}
+    assert set(lengths) == {'bfs', 'dijkstra'} and lengths['bfs'] == lengths['dijkstra'] > 0
+    assert 'unknown op' in by_id['c'][0]['error']
+
+
+def test_rejects_even_and_oversized_mazes():
+    replies = asyncio.run(exchange(SolveServer(workers=1), [
+        {'id': 1, 'op': 'solve', 'maze': {'size': 22}},
+        {'id': 2, 'op': 'generate', 'size': 21, 'cols': 40},
+        {'id': 3, 'op': 'generate', 'size': 10001},
+    ]))
+    assert sorted(reply['id'] for reply in replies) == [1, 2, 3]
+    assert all("odd integers" in reply['error'] for reply in replies)
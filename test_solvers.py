@@ -0,0 +1,202 @@
+from collections import deque
+import heapq
+import random
+
+import pytest
+
+from mazefile import load_maze, save_maze
+from mazegen import GENERATORS, Maze, add_terrain, generate_maze
+from solvers import DIRECTIONS, SOLVERS, LPAStar, path_cost, solve
+
+
+def open_loops(maze, seed, count):
+    # Knock out random walls so the maze has cycles and ties between shortest paths
+    rng = random.Random(seed)
+    for _ in range(count):
+        x, y = rng.randrange(1, maze.rows - 1), rng.randrange(1, maze.cols - 1)
+        maze.cells[x * maze.cols + y] = 0
+    return maze
+
+
+def reference_bfs(maze, start, goal):
+    # The solver as it was before the flat-index rewrite: cells are marked when popped
+    # and the last cell to discover a neighbour becomes its parent
+    rows, cols = len(maze), len(maze[0])
+    queue = deque([start])
+    visited = set()
+    parents = {}
+    nodes = 0
+    while queue:
+        current = queue.popleft()
+        if current in visited:
+            continue
+        visited.add(current)
+        nodes += 1
+        if current == goal:
+            path = [current]
+            while path[-1] in parents:
+                path.append(parents[path[-1]])
+            return path[::-1], nodes
+        x, y = current
+        for dx, dy in DIRECTIONS:
+            nx, ny = x + dx, y + dy
+            if (0 <= nx < rows and 0 <= ny < cols and
+                    (nx, ny) not in visited and maze[nx][ny] == 0):
+                queue.append((nx, ny))
+                parents[(nx, ny)] = current
+    return [], nodes
+
+
+def reference_distances(maze, start):
+    # Plain heap Dijkstra over coordinates, honouring terrain costs when present
+    rows, cols = len(maze), len(maze[0])
+    distances = {start: 0}
+    heap = [(0, start)]
+    while heap:
+        distance, (x, y) = heapq.heappop(heap)
+        if distance > distances[(x, y)]:
+            continue
+        for dx, dy in DIRECTIONS:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < rows and 0 <= ny < cols and maze[nx][ny] == 0:
+                new_distance = distance + maze.cost(nx, ny)
+                if new_distance < distances.get((nx, ny), float('inf')):
+                    distances[(nx, ny)] = new_distance
+                    heapq.heappush(heap, (new_distance, (nx, ny)))
+    return distances
+
+
+def assert_valid_path(maze, path, start, goal):
+    assert path[0] == start and path[-1] == goal
+    for (x, y), (nx, ny) in zip(path, path[1:]):
+        assert abs(x - nx) + abs(y - ny) == 1
+        assert maze[nx][ny] == 0
+
+
+def grids():
+    for seed in range(6):
+        size = 21 + 10 * seed
+        yield f"perfect-{seed}", generate_maze(size, seed)
+        yield f"looped-{seed}", open_loops(generate_maze(size, seed), seed, size * 2)
+
+
+GRIDS = list(grids())
+GRID_IDS = [name for name, _ in GRIDS]
+
+
+@pytest.mark.parametrize('name, maze', GRIDS, ids=GRID_IDS)
+@pytest.mark.parametrize('method', ['bidirectional_bfs', 'jps'])
+def test_bidirectional_and_jump_point_search_find_shortest_paths(method, name, maze):
+    start, goal = (1, 1), (maze.rows - 2, maze.cols - 2)
+    path, nodes = solve(method, maze, start, goal)
+    assert_valid_path(maze, path, start, goal)
+    assert len(path) == len(reference_bfs(maze, start, goal)[0])
+    assert 0 < nodes <= maze.cells.count(0)
+
+
+@pytest.mark.parametrize('name, maze', GRIDS, ids=GRID_IDS)
+def test_lpastar_finds_shortest_paths(name, maze):
+    start, goal = (1, 1), (maze.rows - 2, maze.cols - 2)
+    path, nodes = solve('lpastar', maze, start, goal)
+    assert_valid_path(maze, path, start, goal)
+    assert len(path) == len(reference_bfs(maze, start, goal)[0])
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_lpastar_replans_after_edits(seed):
+    maze = open_loops(generate_maze(41, seed), seed, 60)
+    start, goal = (1, 1), (39, 39)
+    planner = LPAStar(maze, start, goal)
+    planner.replan()
+    rng = random.Random(seed)
+    for _ in range(10):
+        for _ in range(5):
+            x, y = rng.randrange(1, 40), rng.randrange(1, 40)
+            if (x, y) not in (start, goal):
+                maze.cells[x * maze.cols + y] ^= 1
+                planner.update_cell(x, y)
+        path, _ = planner.replan()
+        expected = reference_bfs(maze, start, goal)[0]
+        assert len(path) == len(expected)
+        if path:
+            assert_valid_path(maze, path, start, goal)
+
+
+def weighted_grids():
+    for seed in range(6):
+        size = 21 + 10 * seed
+        yield f"weighted-{seed}", add_terrain(generate_maze(size, seed), seed)
+        yield f"weighted-looped-{seed}", add_terrain(
+            open_loops(generate_maze(size, seed), seed, size * 2), seed)
+
+
+WEIGHTED_GRIDS = list(weighted_grids())
+
+
+@pytest.mark.parametrize('name, maze', GRIDS + WEIGHTED_GRIDS,
+                         ids=GRID_IDS + [name for name, _ in WEIGHTED_GRIDS])
+@pytest.mark.parametrize('method', ['astar_manhattan', 'astar_euclidean', 'dijkstra'])
+def test_cost_aware_solvers_find_cheapest_paths(method, name, maze):
+    start, goal = (1, 1), (maze.rows - 2, maze.cols - 2)
+    path, nodes = solve(method, maze, start, goal)
+    assert_valid_path(maze, path, start, goal)
+    distances = reference_distances(maze, start)
+    assert path_cost(maze, path) == distances[goal]
+    if method == 'dijkstra':
+        # Every cell strictly cheaper than the goal is settled before it, and none dearer
+        closer = sum(1 for distance in distances.values() if distance < distances[goal])
+        tied = sum(1 for distance in distances.values() if distance == distances[goal])
+        assert closer < nodes <= closer + tied
+
+
+@pytest.mark.parametrize('name, maze', GRIDS + WEIGHTED_GRIDS,
+                         ids=GRID_IDS + [name for name, _ in WEIGHTED_GRIDS])
+@pytest.mark.parametrize('method', sorted(SOLVERS))
+def test_solvers_on_flat_grid(method, name, maze):
+    start, goal = (1, 1), (maze.rows - 2, maze.cols - 2)
+    path, nodes = solve(method, maze, start, goal)
+    assert_valid_path(maze, path, start, goal)
+    assert 0 < nodes <= maze.cells.count(0)
+    if method == 'bfs':
+        # Same tie-break as before the rewrite, so the very same path and expansions
+        assert (path, nodes) == reference_bfs(maze, start, goal)
+
+
+@pytest.mark.parametrize('method', sorted(SOLVERS))
+def test_solvers_report_unreachable_goal(method):
+    maze = generate_maze(21, 3)
+    for x, y in ((18, 19), (19, 18)):
+        maze.cells[x * maze.cols + y] = 1
+    path, nodes = solve(method, maze, (1, 1), (19, 19))
+    assert path == []
+    assert nodes > 0
+
+
+@pytest.mark.parametrize('method', sorted(SOLVERS))
+def test_solvers_accept_list_and_packed_grids(tmp_path, method):
+    maze = add_terrain(open_loops(generate_maze(25, 4), 4, 40), 4)
+    start, goal = (1, 1), (23, 23)
+    expected = solve(method, maze, start, goal)
+    # Plain lists carry no terrain, so they are compared with an unweighted copy
+    lists = maze.to_lists()
+    assert solve(method, lists, start, goal) == solve(method, Maze.from_lists(lists), start, goal)
+    save_maze(tmp_path / 'maze.bin', maze)
+    with load_maze(tmp_path / 'maze.bin') as packed:
+        assert solve(method, packed, start, goal) == expected
+
+
+@pytest.mark.parametrize('generator', sorted(GENERATORS))
+def test_generated_mazes_are_perfect(generator):
+    _, generate = GENERATORS[generator]
+    maze = generate(31, 7, 45)
+    start, goal = (1, 1), (29, 43)
+    path, nodes = solve('bfs', maze, start, goal)
+    assert_valid_path(maze, path, start, goal)
+    # A perfect maze is a spanning tree over its open cells: BFS reaches all of them
+    # and there is exactly one passage per cell but the root
+    rows = maze.to_lists()
+    open_cells = [(x, y) for x in range(31) for y in range(45) if rows[x][y] == 0]
+    edges = sum(1 for x, y in open_cells for nx, ny in ((x + 1, y), (x, y + 1))
+                if rows[nx][ny] == 0)
+    assert edges == len(open_cells) - 1
+    assert reference_bfs(maze, start, None)[1] == len(open_cells)
@@ -0,0 +1,102 @@
+import numpy as np
+
+from mazefile import BitMaze
+from mazegen import Maze
+
+UNREACHABLE = -1
+
+
+def cell_grid(maze):
+    # 2-D uint8 view of the cells (1 = wall); Maze buffers are viewed without copying
+    if isinstance(maze, Maze):
+        return np.frombuffer(maze.cells, dtype=np.uint8).reshape(maze.rows, maze.cols)
+    if isinstance(maze, BitMaze):
+        return maze.unpack()
+    return np.asarray(maze, dtype=np.uint8)
+
+
+def cost_grid(maze):
+    # 2-D uint8 view of the terrain costs, or None when the maze is unweighted
+    costs = getattr(maze, 'costs', None)
+    if costs is None:
+        return None
+    return np.frombuffer(costs, dtype=np.uint8).reshape(len(maze), len(maze[0]))
+
+
+def open_cells(maze):
+    return cell_grid(maze) == 0
+
+
+class DistanceField:
+    # BFS distances from one source to every cell, computed by expanding the whole
+    # frontier at once with array operations. Unreachable cells hold UNREACHABLE.
+    def __init__(self, maze, source):
+        passable = open_cells(maze)
+        self.rows, self.cols = passable.shape
+        self.source = tuple(source)
+
+        # A one-cell wall border lets neighbour offsets run without bounds checks
+        padded = np.zeros((self.rows + 2, self.cols + 2), dtype=bool)
+        padded[1:-1, 1:-1] = passable
+        self._stride = self.cols + 2
+        self._offsets = np.array([1, -1, self._stride, -self._stride])
+        self._open = padded.ravel()
+        self._flat = np.full(self._open.size, UNREACHABLE, dtype=np.int32)
+
+        if passable[self.source]:
+            self._expand(self._index(self.source))
+        self.distances = self._flat.reshape(self.rows + 2, self.cols + 2)[1:-1, 1:-1]
+        self.nodes_visited = int(np.count_nonzero(self.distances >= 0))
+
+    def _index(self, cell):
+        return (cell[0] + 1) * self._stride + cell[1] + 1
+
+    def _expand(self, source_index):
+        dist, passable, offsets = self._flat, self._open, self._offsets
+        frontier = np.array([source_index])
+        dist[source_index] = 0
+        level = 0
+        while frontier.size:
+            level += 1
+            neighbours = (frontier[:, None] + offsets).ravel()
+            neighbours = neighbours[passable[neighbours] & (dist[neighbours] < 0)]
+            # Cells reached from several frontier cells must enter the next frontier once
+            frontier = np.unique(neighbours)
+            dist[frontier] = level
+
+    @property
+    def nbytes(self):
+        return self._flat.nbytes + self._open.nbytes
+
+    def distance(self, goal):
+        return int(self.distances[tuple(goal)])
+
+    def distances_to(self, goals):
+        goals = np.asarray(goals)
+        return self.distances[goals[:, 0], goals[:, 1]]
+
+    def path_to(self, goal):
+        # Walk downhill from the goal; each step finds a neighbour one closer to the source
+        index = self._index(goal)
+        remaining = int(self._flat[index])
+        if remaining < 0:
+            return []
+        dist = self._flat
+        offsets = self._offsets.tolist()
+        cells = [index]
+        while remaining:
+            remaining -= 1
+            for offset in offsets:
+                if dist[index + offset] == remaining:
+                    index += offset
+                    break
+            cells.append(index)
+        return [(i // self._stride - 1, i % self._stride - 1) for i in reversed(cells)]
+
+    def solve(self, goal):
+        # Same (path, nodes_visited) shape as the solvers module
+        return self.path_to(goal), self.nodes_visited
+
+
+def distance_field(maze, source):
+    return DistanceField(maze, source)